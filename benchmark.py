@@ -0,0 +1,171 @@
+"""Benchmark suite for the simulation step, fitness evaluation and a GA generation
+
+Sweeps agent counts, grid sizes and agent speeds derived from config.py.
+Runs entirely offline. Usage:
+
+    python benchmark.py              # run and print timings
+    python benchmark.py --save       # run and store them as the JSON baseline
+    python benchmark.py --compare    # run and flag regressions against the baseline
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import time
+from cache import FitnessCache
+from model import EvolvingModel, ENGINES
+from utils import decode_genome
+import evaluation
+from config import *  # Import all configuration constants
+
+STEP_WARMUP = 3   # Untimed steps before each step benchmark
+STEPS_TIMED = 10  # Steps per timed repeat
+BENCHMARK_SEED = 0  # Seed of every simulated run and GA, so each case times the same workload
+
+def sweep():
+    """Agent counts, grid sizes and speeds to benchmark, scaled from config.py"""
+    agent_counts = [NUM_AGENTS, NUM_AGENTS * 10]
+    grid_sizes = [(GRID_WIDTH, GRID_HEIGHT), (GRID_WIDTH * 4, GRID_HEIGHT * 4)]
+    slowest = decode_genome([SPEED_MIN, EXPLORATION_MIN])[0]
+    fastest = decode_genome([SPEED_MAX, EXPLORATION_MIN])[0]
+    return agent_counts, grid_sizes, list(range(slowest, fastest + 1))
+
+def best_time(func, repeats=BENCHMARK_REPEATS):
+    """Fastest of `repeats` timed calls of func, in seconds"""
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+def genome_for_speed(speed):
+    """A genome that decodes to `speed` with a middling exploration chance"""
+    return [speed + 0.5, 0.5]
+
+def bench_steps(results):
+    """Seconds per EvolvingModel.step for every engine and sweep point"""
+    agent_counts, grid_sizes, speeds = sweep()
+    for engine in ENGINES:
+        for num_agents in agent_counts:
+            for width, height in grid_sizes:
+                for speed in speeds:
+                    genomes = [genome_for_speed(speed)] * num_agents
+                    model = EvolvingModel(genomes, width, height, engine=engine, seed=BENCHMARK_SEED,
+                                          verbose=False, resolver=CONFLICT_RESOLVER)
+                    for _ in range(STEP_WARMUP):
+                        model.step()
+
+                    def run_steps():
+                        for _ in range(STEPS_TIMED):
+                            model.step()
+                    name = f"step/{engine}/agents={num_agents}/grid={width}x{height}/speed={speed}"
+                    results[name] = best_time(run_steps) / STEPS_TIMED
+                    report(name, results[name])
+
+def bench_fitness(results):
+    """Seconds per uncached fitness_func call at each speed"""
+    for speed in sweep()[2]:
+        solution = genome_for_speed(speed)
+
+        def evaluate():
+            evaluation.set_cache(FitnessCache(0))  # Nothing cached, so every call simulates
+            evaluation.fitness_func(None, solution, 0)
+        name = f"fitness_func/speed={speed}"
+        results[name] = best_time(evaluate)
+        report(name, results[name])
+
+def bench_generation(results):
+    """Seconds for one GA generation with an empty fitness cache"""
+    from main import create_ga_instance
+
+    def run_generation():
+        evaluation.set_cache(FitnessCache(0))
+        with contextlib.redirect_stdout(io.StringIO()):
+            # No on_generation, so no checkpoint is ever written
+            create_ga_instance(num_generations=1, random_seed=BENCHMARK_SEED, on_generation=None).run()
+    run_generation()  # Start the worker pool outside the timings
+    name = f"ga_generation/population={GA_POPULATION_SIZE}"
+    results[name] = best_time(run_generation)
+    report(name, results[name])
+
+def report(name, seconds):
+    print(f"   {name:<52} {seconds * 1000:10.3f} ms")
+
+def run_benchmarks():
+    print(f"⏱️  Benchmarking (fastest of {BENCHMARK_REPEATS} repeats)")
+    results = {}
+    seed = evaluation.GA_SEED
+    evaluation.GA_SEED = BENCHMARK_SEED  # Fitness runs simulate the same draws on every call
+    try:
+        bench_steps(results)
+        bench_fitness(results)
+        bench_generation(results)
+    finally:
+        evaluation.GA_SEED = seed
+        evaluation.shutdown_pool()
+    return results
+
+def save_baseline(results, path=BENCHMARK_BASELINE_FILE):
+    """Store results as the JSON baseline, with the settings they were measured under"""
+    data = {
+        "results": results,
+        "config": {"NUM_AGENTS": NUM_AGENTS, "GRID_WIDTH": GRID_WIDTH, "GRID_HEIGHT": GRID_HEIGHT,
+                   "SIMULATION_STEPS": SIMULATION_STEPS, "GA_POPULATION_SIZE": GA_POPULATION_SIZE,
+                   "CONFLICT_RESOLVER": CONFLICT_RESOLVER, "GA_WORKERS": GA_WORKERS},
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "recorded": time.strftime("%Y-%m-%d %H:%M:%S"),
+    }
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=2)
+    print(f"💾 Baseline saved to {path}")
+
+def compare(results, path=BENCHMARK_BASELINE_FILE, threshold=BENCHMARK_REGRESSION_THRESHOLD):
+    """Print each case against the baseline and return the names that regressed"""
+    if not os.path.exists(path):
+        print(f"❌ No baseline at {path}; run with --save first")
+        return None
+    with open(path, 'r') as f:
+        baseline = json.load(f)["results"]
+
+    regressions = []
+    print(f"📊 Compared with {path} (regression threshold {threshold:.0%})")
+    for name, seconds in results.items():
+        if name not in baseline:
+            print(f"   {name:<52} new case")
+            continue
+        ratio = seconds / baseline[name]
+        flag = ""
+        if ratio > 1 + threshold:
+            regressions.append(name)
+            flag = "  ⚠️  REGRESSION"
+        print(f"   {name:<52} {ratio:6.2f}x baseline{flag}")
+    if regressions:
+        print(f"❌ {len(regressions)} case(s) slower than the baseline by more than {threshold:.0%}")
+    else:
+        print("✅ No regressions")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--save", action="store_true", help="store the results as the baseline")
+    parser.add_argument("--compare", action="store_true", help="flag regressions against the baseline")
+    parser.add_argument("--baseline", default=BENCHMARK_BASELINE_FILE, help="baseline JSON file")
+    parser.add_argument("--threshold", type=float, default=BENCHMARK_REGRESSION_THRESHOLD,
+                        help="allowed slowdown before a case is flagged (0.1 = 10%%)")
+    args = parser.parse_args()
+
+    results = run_benchmarks()
+    if args.compare:
+        regressions = compare(results, args.baseline, args.threshold)
+        if regressions is None or regressions:
+            sys.exit(1)
+    if args.save:
+        save_baseline(results, args.baseline)
+
+if __name__ == '__main__':
+    main()
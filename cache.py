@@ -0,0 +1,70 @@
+import json
+import os
+from collections import OrderedDict
+from config import DEBUG_MODE
+
+CACHE_VERSION = "2.0"  # Bump whenever simulation results for the same key change
+
+class FitnessCache:
+    """LRU cache of fitness values keyed on phenotype tuples, optionally stored on disk"""
+
+    def __init__(self, max_size, path=None):
+        self.max_size = max_size
+        self.path = path
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        if path:
+            self.load()
+
+    def get(self, key):
+        """Return the cached fitness for key, or None"""
+        fitness = self.entries.get(key)
+        if fitness is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return fitness
+
+    def put(self, key, fitness):
+        self.entries[key] = fitness
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def load(self):
+        """Load entries from the on-disk store, if present"""
+        try:
+            if os.path.exists(self.path):
+                with open(self.path, 'r') as f:
+                    data = json.load(f)
+                if data.get("version") != CACHE_VERSION:
+                    print(f"⚠️  Ignoring fitness cache {self.path}: version {data.get('version')}, "
+                          f"expected {CACHE_VERSION}")
+                    return
+                for *key, fitness in data["entries"]:
+                    self.put(tuple(key), fitness)
+                if DEBUG_MODE:
+                    print(f"🔍 Loaded {len(self.entries)} cached fitness values")
+        except Exception as e:
+            print(f"⚠️  Error loading fitness cache: {e}")
+
+    def save(self):
+        """Write entries to the on-disk store"""
+        if not self.path:
+            return
+        try:
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump({
+                    "entries": [[*key, fitness] for key, fitness in self.entries.items()],
+                    "version": CACHE_VERSION
+                }, f)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            print(f"❌ Error saving fitness cache: {e}")
@@ -0,0 +1,84 @@
+import os
+import random
+import numpy as np
+from config import DEBUG_MODE
+
+def save_checkpoint(ga_instance, path, truncated=None):
+    """Write the GA population, fitness, RNG states and generation to an .npz file
+
+    `truncated` flags members whose fitness comes from runs stopped early;
+    they are re-evaluated rather than reused when the checkpoint is loaded.
+    The file is written next to `path` and renamed over it, so an
+    interrupted save never leaves a truncated checkpoint behind.
+    """
+    if truncated is None:
+        truncated = np.zeros(len(ga_instance.population), dtype=bool)
+    _, keys, pos, has_gauss, cached_gauss = np.random.get_state()
+    py_version, py_state, py_gauss = random.getstate()
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'wb') as f:
+        np.savez_compressed(
+            f,
+            population=ga_instance.population,
+            fitness=np.asarray(ga_instance.last_generation_fitness, dtype=float),
+            truncated=np.asarray(truncated, dtype=bool),
+            generation=ga_instance.generations_completed,
+            best_fitness=np.asarray(ga_instance.best_solutions_fitness, dtype=float),
+            np_rng_keys=keys,
+            np_rng_pos=pos,
+            np_rng_gauss=(has_gauss, cached_gauss),
+            py_rng_version=py_version,
+            py_rng_state=np.array(py_state, dtype=np.int64),
+            py_rng_gauss=np.nan if py_gauss is None else py_gauss,
+        )
+    os.replace(tmp_path, path)
+    if DEBUG_MODE:
+        print(f"💾 Checkpoint saved to {path} (generation {ga_instance.generations_completed})")
+
+def load_checkpoint(path):
+    """Load a checkpoint written by save_checkpoint, or None if there is none"""
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        with np.load(path) as data:
+            return {name: data[name] for name in data.files}
+    except Exception as e:
+        print(f"⚠️  Error loading checkpoint: {e}")
+        return None
+
+def restore_rng(checkpoint):
+    """Put NumPy's and Python's global generators back in the checkpointed state"""
+    has_gauss, cached_gauss = checkpoint["np_rng_gauss"]
+    np.random.set_state(("MT19937", checkpoint["np_rng_keys"], int(checkpoint["np_rng_pos"]),
+                         int(has_gauss), float(cached_gauss)))
+    py_gauss = float(checkpoint["py_rng_gauss"])
+    random.setstate((int(checkpoint["py_rng_version"]),
+                     tuple(checkpoint["py_rng_state"].tolist()),
+                     None if np.isnan(py_gauss) else py_gauss))
+
+def reuse_fitness(ga_instance, fitness, truncated=None):
+    """Let pygad take the population's known fitness instead of re-evaluating it
+
+    pygad reuses the fitness of last generation's parents, so the restored
+    population is presented as the parents (needs keep_parents != 0).
+    Members flagged in `truncated` are left out, so they are evaluated again.
+    """
+    known = np.arange(len(ga_instance.population))
+    if truncated is not None:
+        known = known[~np.asarray(truncated, dtype=bool)]
+    ga_instance.last_generation_parents = ga_instance.population[known].copy()
+    ga_instance.last_generation_parents_indices = known
+    ga_instance.previous_generation_fitness = np.asarray(fitness, dtype=float)
+
+def resume(ga_instance, checkpoint):
+    """Continue a checkpointed run: generation count, best-fitness history, fitness and RNGs"""
+    ga_instance.generations_completed = int(checkpoint["generation"])
+    ga_instance.best_solutions_fitness = checkpoint["best_fitness"].tolist()
+    reuse_fitness(ga_instance, checkpoint["fitness"], checkpoint.get("truncated"))
+    restore_rng(checkpoint)
+
+def best_of(checkpoint):
+    """Return (best solution, its fitness) from a checkpoint"""
+    fitness = np.where(checkpoint.get("truncated", False), -np.inf, checkpoint["fitness"])
+    best = int(np.argmax(fitness))
+    return checkpoint["population"][best], float(checkpoint["fitness"][best])
@@ -7,6 +7,8 @@ GENOME_LENGTH = 2        # Number of genes per agent (speed, exploration_chance)
 SIMULATION_STEPS = 50    # Steps per fitness evaluation
 GRID_WIDTH = 10          # Grid width
 GRID_HEIGHT = 10         # Grid height
+SIMULATION_ENGINE = "agents"  # "agents" (Mesa per-agent loop) or "numpy" (array engine for large grids)
+CONFLICT_RESOLVER = "fitness"  # "fitness" (losers re-pick once, may still collide) or "exclusive" (collision-free single pass)
 
 # === GENETIC ALGORITHM PARAMETERS ===
 GA_GENERATIONS = 30      # Number of evolution cycles
@@ -14,6 +16,55 @@ GA_POPULATION_SIZE = 15  # Population size for GA
 GA_PARENTS_MATING = 6    # Number of parents for mating
 GA_MUTATION_RATE = 25    # Mutation percentage
 GA_KEEP_PARENTS = 2      # Number of parents to keep each generation
+GA_WORKERS = 0           # Processes for fitness evaluation (1 = serial, 0 = one per CPU core)
+GA_SEED = None           # Seed for the GA and every fitness simulation (None = not reproducible)
+GA_CRN_SEEDS = 0         # Common random numbers: simulate every candidate on the same K seeds (0 = off)
+GA_EARLY_STOP = True     # End simulations once coverage saturates or they cannot beat last generation's parents
+GA_BATCH_WORLDS = True   # Simulate each generation's candidates as one batch of worlds on the array engine
+PROFILE_STEPS = False    # Record per-phase step timings, conflicts and coverage during the GA
+METRICS_FILE = "ga_metrics.json"  # Profiling summary of the last GA run, next to GENOME_SAVE_FILE
+
+# === FITNESS CACHE ===
+# Only seeded runs are cached (GA_SEED or GA_CRN_SEEDS); an unseeded run is one random draw
+FITNESS_CACHE_SIZE = 10000            # Max cached phenotypes (least recently used are evicted)
+FITNESS_CACHE_QUANTUM = 0.001         # Exploration chance resolution for cache keys
+FITNESS_CACHE_FILE = "fitness_cache.json"  # Stored next to GENOME_SAVE_FILE (None = memory only)
+
+# === BENCHMARKS ===
+BENCHMARK_BASELINE_FILE = "benchmark_baseline.json"  # Written by benchmark.py --save
+BENCHMARK_REPEATS = 5                  # Timed repeats per case (the fastest is kept)
+BENCHMARK_REGRESSION_THRESHOLD = 0.10  # --compare flags cases more than 10% slower
+
+# === ISLAND MODEL ===
+GA_ISLANDS = 0              # Populations evolved in parallel processes (0 or 1 = single population)
+GA_MIGRATION_INTERVAL = 5   # Generations between migrations around the island ring
+GA_MIGRANTS = 2             # Best genomes each island sends to its neighbour
+
+# === SURROGATE SCREENING ===
+GA_SURROGATE = False        # Skip simulating offspring a fitted surrogate predicts cannot become parents
+SURROGATE_DEGREE = 3        # Polynomial degree in exploration_chance, one fit per speed level
+SURROGATE_MIN_SAMPLES = 6   # Exact evaluations a speed level needs before it is screened
+SURROGATE_MARGIN = 2.0      # Residual spreads a prediction must fall below the worst parent
+SURROGATE_AUDIT_EVERY = 5   # Simulate every Nth screened-out candidate anyway to measure drift
+
+# === RACING ===
+GA_RACING = False           # Successive halving: every candidate gets a short run, only the best get longer runs and more seeds
+# Shorter runs than the team needs to cover the grid about three times let nearly every agent
+# find a new cell each step, so every candidate scores the cap and the rung cannot rank them
+GA_RACING_MIN_STEPS = min(SIMULATION_STEPS, max(SIMULATION_STEPS // 5, 3 * GRID_WIDTH * GRID_HEIGHT // NUM_AGENTS))
+GA_RACING_RUNGS = ((GA_RACING_MIN_STEPS, 1), (max(GA_RACING_MIN_STEPS, SIMULATION_STEPS // 2), 2),
+                   (SIMULATION_STEPS, 3))  # (steps, seeds) per rung
+GA_RACING_PROMOTE = 0.5     # Fraction of a rung's candidates promoted to the next rung
+
+# === TRAJECTORIES ===
+TRAJECTORY_FILE = "trajectory.npy"  # Recording written by trajectory.py and replayed by visualization.py
+TRAJECTORY_VISITED = True   # Also record which steps reached a cell new to each agent
+TRAJECTORY_HEAT_INTERVAL = 50  # Steps between cumulative heat checkpoints (replay jumps read fewer rows than this)
+
+# === CHECKPOINTS ===
+GA_CHECKPOINT_FILE = "ga_checkpoint.npz"  # Stored next to GENOME_SAVE_FILE, one .islandN file per island (None = no checkpoints)
+GA_CHECKPOINT_INTERVAL = 5  # Generations between checkpoints
+GA_RESUME = "off"           # "resume" continues the checkpointed run, "seed" starts a new run from its population
 
 # === GENOME CONSTRAINTS ===
 SPEED_MIN = 0.1          # Minimum speed value
@@ -23,7 +74,10 @@ EXPLORATION_MAX = 3.0    # Maximum exploration chance
 
 # === VISUALIZATION PARAMETERS ===
 VISUALIZATION_PORT = 8521 # Port for Mesa visualization server
-CANVAS_SIZE = 500        # Canvas size in pixels
+CANVAS_SIZE = 500        # Canvas size in pixels (along the grid's longer side)
+VIZ_RENDERER = "auto"    # "portrayal" (Mesa shape per agent), "raster" (heatmap + streamed deltas) or "auto"
+VIZ_PORTRAYAL_LIMIT = 2500  # "auto" switches to the raster renderer above this many cells or agents
+VIZ_HEAT_SATURATION = 10    # Agent-steps on a cell that give the darkest heatmap shade
 
 # === FILE PATHS ===
 GENOME_SAVE_FILE = "best_genome.json"
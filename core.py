@@ -0,0 +1,80 @@
+import random
+from engine import ArrayEngine, RESOLVERS
+from topology import get_topology
+
+
+class StepRunner:
+    """Early-stopping run loop shared by EvolvingModel and HeadlessModel"""
+
+    def run(self, steps, stop_below=None):
+        """Run up to `steps` steps and return how many were executed
+
+        Stops early once no agent can add another cell, or once the best
+        total fitness still reachable falls below `stop_below`.
+        """
+        for step in range(steps):
+            bound = self.fitness_bound(steps - step)
+            if bound == self.get_total_fitness():
+                return step
+            if stop_below is not None and bound < stop_below:
+                return step
+            self.step()
+        return steps
+
+
+class HeadlessModel(StepRunner):
+    """EvolvingModel semantics on the array engine, without importing Mesa
+
+    The random generator is seeded the way mesa.Model seeds its own, so a
+    HeadlessModel and an EvolvingModel built with the same genomes and seed
+    produce the same run. Used for fitness evaluation and batch jobs, where
+    there is nothing to draw.
+    """
+
+    def __init__(self, genomes, width=10, height=10, seed=None, resolver="fitness", metrics=None):
+        if resolver not in RESOLVERS:
+            raise ValueError(f"Unknown resolver {resolver!r}, expected one of {RESOLVERS}")
+        self.resolver = resolver
+        self.metrics = metrics  # Optional StepMetrics for per-phase profiling
+        self.topology = get_topology(width, height)  # Shared neighbour tables
+        self.random = random.Random()
+        self.array_engine = None
+        self.reset(genomes, seed)
+
+    def reset(self, genomes, seed=None):
+        """Reinitialize in place for a new run with `genomes`"""
+        # Like Model.__new__, an unseeded run draws a fresh seed
+        self.random.seed(seed if seed is not None else random.random())
+        self.genomes = genomes
+        self.running = True
+        if self.metrics is not None:
+            self.metrics.start_run()
+        if self.array_engine is None:
+            self.array_engine = ArrayEngine([genomes], self.topology, [self.random],
+                                            self.resolver, self.metrics)
+        else:
+            self.array_engine.reset([genomes])
+
+    def step(self):
+        """Execute one time step for all agents"""
+        self.array_engine.step()
+
+    def fitness_bound(self, remaining_steps):
+        """Highest total fitness reachable within `remaining_steps` more steps"""
+        return int(self.array_engine.fitness_bound(remaining_steps)[0])
+
+    def agent_cells(self):
+        """Cell index (x * height + y) of every agent, in agent order"""
+        return self.array_engine.cell.copy()
+
+    def agent_visit_counts(self):
+        """Number of cells each agent has visited"""
+        return self.array_engine.visited_counts()
+
+    def get_total_fitness(self):
+        """Get combined fitness of all agents"""
+        return self.array_engine.total_fitness()
+
+    def get_team_coverage(self):
+        """Get the number of distinct cells visited by any agent"""
+        return self.array_engine.team_coverage()
@@ -0,0 +1,388 @@
+import numpy as np
+from topology import MAX_SPEED
+from utils import decode_genome
+
+INF_DISTANCE = 1 << 40  # Stands in for "no agent" in distance fields
+BRUTE_FORCE_LIMIT = 1 << 17  # Cell x agent pairs below which pairwise distances are cheaper
+MAX_MOVES = (2 * MAX_SPEED + 1) ** 2 - 1
+RESOLVERS = ("fitness", "exclusive")
+
+
+def tie_break_key(ids, salt):
+    """Seeded per-step shuffle of agent ids (a bijection on 32-bit ids, for ints or arrays)"""
+    return ((ids ^ salt) * 0x9E3779B1) & 0xFFFFFFFF
+
+
+def _relax(field, cur, src):
+    """Offer the two entries of line `src` (one step further away) to line `cur`"""
+    d1, l1, d2, l2 = field
+    for cand_d, cand_l in ((d1[src] + 1, l1[src]), (d2[src] + 1, l2[src])):
+        best_d, best_l, second_d, second_l = d1[cur], l1[cur], d2[cur], l2[cur]
+        same = cand_l == best_l
+        closer = ~same & (cand_d < best_d)
+        second = ~same & ~closer & (cand_d < second_d)
+        new_d2 = np.where(closer, best_d, np.where(second, cand_d, second_d))
+        new_l2 = np.where(closer, best_l, np.where(second, cand_l, second_l))
+        new_d1 = np.where(closer, cand_d, np.where(same, np.minimum(best_d, cand_d), best_d))
+        new_l1 = np.where(closer, cand_l, best_l)
+        d1[cur], l1[cur], d2[cur], l2[cur] = new_d1, new_l1, new_d2, new_l2
+
+
+def _sweep(field, axis):
+    """Propagate nearest entries around the torus along one axis"""
+    lines = [a if axis == 0 else a.T for a in field]
+    n = lines[0].shape[0]
+    if n < 2:
+        return
+    # Two laps each way so distances can wrap around the torus
+    for i in range(1, 2 * n):
+        _relax(lines, i % n, (i - 1) % n)
+    for i in range(2 * n - 2, -1, -1):
+        _relax(lines, i % n, (i + 1) % n)
+
+
+def _pairwise_distance_field(cells, width, height):
+    """nearest_distance_field by comparing every cell with every occupied cell"""
+    xs, ys = np.divmod(np.arange(width * height), height)
+    sx, sy = np.divmod(cells, height)
+    dx = np.abs(xs[:, None] - sx)
+    dy = np.abs(ys[:, None] - sy)
+    dist = np.minimum(dx, width - dx) + np.minimum(dy, height - dy)
+    if len(cells) < 2:
+        d1 = dist[:, 0] if len(cells) else np.full(len(xs), INF_DISTANCE, dtype=np.int64)
+        l1 = np.full(len(xs), cells[0] if len(cells) else -1, dtype=np.int64)
+        return d1, l1, np.full(len(xs), INF_DISTANCE, dtype=np.int64)
+    nearest = np.argpartition(dist, 1, axis=1)[:, :2]
+    pair = np.take_along_axis(dist, nearest, axis=1)
+    first = pair.argmin(axis=1)
+    rows = np.arange(len(xs))
+    return pair[rows, first], cells[nearest[rows, first]], pair[rows, 1 - first]
+
+
+def nearest_distance_field(cells, width, height):
+    """Distances from every cell to the two nearest distinct occupied cells
+
+    Uses torus Manhattan distance. Returns flat arrays (d1, l1, d2): the
+    distance to the nearest occupied cell, that cell's index and the distance
+    to the nearest occupied cell other than l1. Missing entries hold
+    INF_DISTANCE (and -1 for the label).
+    """
+    if len(cells) * width * height <= BRUTE_FORCE_LIMIT:
+        return _pairwise_distance_field(cells, width, height)
+    shape = (width, height)
+    d1 = np.full(shape, INF_DISTANCE, dtype=np.int64)
+    l1 = np.full(shape, -1, dtype=np.int64)
+    d2 = np.full(shape, INF_DISTANCE, dtype=np.int64)
+    l2 = np.full(shape, -1, dtype=np.int64)
+    d1.flat[cells] = 0
+    l1.flat[cells] = cells
+    field = [d1, l1, d2, l2]
+    # L1 distance is separable: nearest along each column, then across columns
+    _sweep(field, axis=1)
+    _sweep(field, axis=0)
+    return d1.ravel(), l1.ravel(), d2.ravel()
+
+
+class ArrayEngine:
+    """Vectorized counterpart of the per-agent EvolvingModel step
+
+    Runs one or more independent worlds of the same size and agent count in
+    lockstep. Agents are numbered world by world, so agent a lives in world
+    a // agents_per_world, and positions are flat cell indices
+    (x * height + y). Speeds, exploration chances and visited cells live in
+    NumPy arrays, and each phase works on all agents of all worlds at once.
+    Visited cells are per-agent bitmaps of 64-bit words, with a union bitmap
+    per world for team coverage. Each world draws from its own generator in
+    the same order as EvolvingAgent and EvolvingModel take them, so a seeded
+    world gives the same coverage as the per-agent path.
+    """
+
+    def __init__(self, worlds, topology, rngs, resolver="fitness", metrics=None):
+        self.topology = topology
+        self.resolver = resolver
+        self.metrics = metrics  # Optional StepMetrics for per-phase profiling
+        self.width = topology.width
+        self.height = topology.height
+        self.num_cells = topology.num_cells
+        self.visited = None
+        self.reset(worlds, rngs)
+
+    def reset(self, worlds, rngs=None):
+        """Start a new run of `worlds` (one genome list each), reusing the bitmaps if the shape is unchanged"""
+        sizes = {len(genomes) for genomes in worlds}
+        if len(sizes) > 1:
+            raise ValueError("All worlds must have the same number of agents")
+        if rngs is not None:
+            self.rngs = list(rngs)
+        self.num_worlds = len(worlds)
+        self.agents_per_world = sizes.pop() if sizes else 0
+
+        decoded = [decode_genome(genome) for genomes in worlds for genome in genomes]
+        self.speed = np.array([speed for speed, _ in decoded], dtype=np.int64)
+        self.exploration_chance = np.array([chance for _, chance in decoded], dtype=float)
+
+        # Place agents with the same draws EvolvingModel uses, world by world
+        num_agents = len(decoded)
+        self.world = np.repeat(np.arange(self.num_worlds), self.agents_per_world)
+        self.cell = np.empty(num_agents, dtype=np.int64)
+        for i in range(num_agents):
+            rng = self.rngs[i // self.agents_per_world]
+            x = rng.randrange(self.width)
+            y = rng.randrange(self.height)
+            self.cell[i] = x * self.height + y
+        words = (self.num_cells + 63) // 64
+        if self.visited is None or self.visited.shape != (num_agents, words) \
+                or len(self.coverage) != self.num_worlds:
+            self.visited = np.zeros((num_agents, words), dtype=np.uint64)
+            self.coverage = np.zeros((self.num_worlds, words), dtype=np.uint64)
+        else:
+            self.visited.fill(0)
+            self.coverage.fill(0)
+        self.mark_visited(np.arange(num_agents), self.cell)
+        # Agents per cell, one block of num_cells entries per world
+        self.occupancy = np.bincount(self.slots(self.cell),
+                                     minlength=self.num_worlds * self.num_cells)
+        self.index_speeds()
+
+    def index_speeds(self):
+        """Group agents by speed, with a mask of each agent's real move slots"""
+        self.speed_groups = [(speed, np.flatnonzero(self.speed == speed))
+                             for speed in np.unique(self.speed).tolist()]
+        self.move_valid = np.arange(MAX_MOVES) < ((2 * self.speed + 1) ** 2 - 1)[:, None]
+
+    def keep_worlds(self, worlds):
+        """Drop every world not listed in `worlds`, which keep their order"""
+        worlds = np.asarray(worlds, dtype=np.int64)
+        agents = (worlds[:, None] * self.agents_per_world
+                  + np.arange(self.agents_per_world)).ravel()
+        self.rngs = [self.rngs[w] for w in worlds.tolist()]
+        self.num_worlds = len(worlds)
+        self.world = np.repeat(np.arange(self.num_worlds), self.agents_per_world)
+        self.cell = self.cell[agents]
+        self.speed = self.speed[agents]
+        self.exploration_chance = self.exploration_chance[agents]
+        self.visited = self.visited[agents]
+        self.coverage = self.coverage[worlds]
+        self.occupancy = self.occupancy.reshape(-1, self.num_cells)[worlds].ravel()
+        self.index_speeds()
+
+    def slots(self, cells, agents=slice(None)):
+        """Occupancy indices of cells[k] in the world of agents[k]"""
+        world = self.world[agents]
+        if cells.ndim > 1:
+            world = world[:, None]
+        return world * self.num_cells + cells
+
+    def position(self, i):
+        """Return agent i's position as an (x, y) tuple"""
+        x, y = divmod(int(self.cell[i]), self.height)
+        return (x, y)
+
+    def visited_cells(self, i):
+        """Return agent i's visited cells as a list of (x, y) tuples"""
+        flags = np.unpackbits(self.visited[i].astype("<u8").view(np.uint8), bitorder="little")
+        positions = self.topology.positions
+        return [positions[c] for c in np.flatnonzero(flags[:self.num_cells]).tolist()]
+
+    def is_visited(self, agents, cells):
+        """Bool array: has agents[k] visited cells[k] (broadcasting)"""
+        bits = (cells & 63).astype(np.uint64)
+        return (self.visited[agents, cells >> 6] >> bits) & np.uint64(1) == 1
+
+    def mark_visited(self, agents, cells):
+        """Set the visited bit of cells[k] for agents[k] (one cell per agent)"""
+        bits = np.uint64(1) << (cells & 63).astype(np.uint64)
+        words = cells >> 6
+        self.visited[agents, words] |= bits
+        np.bitwise_or.at(self.coverage, (self.world[agents], words), bits)
+
+    def world_coverage(self):
+        """Number of distinct cells visited in each world"""
+        return np.bitwise_count(self.coverage).sum(axis=1, dtype=np.int64)
+
+    def team_coverage(self):
+        """Distinct cells visited by any agent, summed over worlds"""
+        return int(self.world_coverage().sum())
+
+    def visited_counts(self):
+        """Number of cells each agent has visited (popcount of its bitmap)"""
+        return np.bitwise_count(self.visited).sum(axis=1, dtype=np.int64)
+
+    def agent_fitness(self):
+        """Per-agent fitness, matching EvolvingAgent.get_fitness"""
+        # EvolvingAgent also counts the entry it records before being placed
+        return self.visited_counts() + 1
+
+    def world_fitness(self):
+        """Total fitness of each world"""
+        return self.agent_fitness().reshape(self.num_worlds, -1).sum(axis=1)
+
+    def total_fitness(self):
+        return int(self.agent_fitness().sum())
+
+    def fitness_bound(self, remaining_steps):
+        """Highest total fitness each world can reach within `remaining_steps` steps"""
+        gain = np.minimum(remaining_steps, self.num_cells - self.visited_counts())
+        return self.world_fitness() + gain.reshape(self.num_worlds, -1).sum(axis=1)
+
+    def step(self):
+        """Sense, plan, resolve conflicts and execute for all agents"""
+        metrics = self.metrics
+        if metrics is not None:
+            metrics.start_step(self.num_worlds)
+            metrics.lap("clear")
+        cell = self.cell
+        rows = np.arange(len(cell))[:, None]
+
+        # Sense and communicate: the occupancy index holds the broadcast positions
+        occupancy = self.occupancy
+        options = np.zeros((len(cell), MAX_MOVES), dtype=np.int64)
+        for speed, agents in self.speed_groups:
+            table = self.topology.neighbour_index(speed)
+            options[agents, :table.shape[1]] = table[cell[agents]]
+        others = occupancy[self.slots(options)] - (options == cell[:, None])
+        if metrics is not None:
+            metrics.lap("sense")
+
+        # Plan: collision filter, move scores and exploration draws
+        safe = self.move_valid & (others == 0)
+        unvisited = ~self.is_visited(rows, options)
+
+        score = self.strategic_scores(options, unvisited)
+        score[~safe] = -1
+        strategic = options[rows[:, 0], score.argmax(axis=1)]
+
+        intended = cell.copy()
+        # Draws stay sequential within each world so its random stream matches the agent path
+        for i in np.flatnonzero(safe.any(axis=1)):
+            rng = self.rngs[i // self.agents_per_world]
+            if rng.random() < self.exploration_chance[i]:
+                pool = safe[i] & unvisited[i]
+                if not pool.any():
+                    pool = safe[i]
+                choices = np.flatnonzero(pool)
+                # randrange(n) makes the same draw as random.choice on n items
+                intended[i] = options[i, choices[rng.randrange(len(choices))]]
+            else:
+                intended[i] = strategic[i]
+
+        if metrics is not None:
+            metrics.lap("plan")
+
+        # Resolve move conflicts
+        self.resolve_conflicts(intended, options, safe, unvisited)
+        if metrics is not None:
+            metrics.lap("resolve")
+
+        # Execute all moves
+        moved = np.flatnonzero(intended != cell)
+        self.mark_visited(moved, intended[moved])
+        np.subtract.at(occupancy, self.slots(cell[moved], moved), 1)
+        np.add.at(occupancy, self.slots(intended[moved], moved), 1)
+        self.cell = intended
+        if metrics is not None:
+            metrics.lap("execute")
+            metrics.record_coverage(self.world_coverage().tolist())
+
+    def strategic_scores(self, options, unvisited):
+        """Score every candidate move as EvolvingAgent.choose_strategic_move does"""
+        score = unvisited * 100 + self.topology.edge_distance[options] * 2
+        if self.agents_per_world > 1:
+            score += self.nearest_other_distance(options) * 10
+        return score
+
+    def nearest_other_distance(self, options):
+        """Torus distance from each option to the nearest other agent of the same world"""
+        worlds, per_world = self.num_worlds, self.agents_per_world
+        if per_world * per_world * MAX_MOVES <= BRUTE_FORCE_LIMIT:
+            # Few agents: compare every option with every agent of its world
+            ox, oy = np.divmod(options.reshape(worlds, per_world, -1, 1), self.height)
+            ax, ay = np.divmod(self.cell.reshape(worlds, 1, 1, per_world), self.height)
+            dx = np.abs(ox - ax)
+            dy = np.abs(oy - ay)
+            dist = np.minimum(dx, self.width - dx) + np.minimum(dy, self.height - dy)
+            own = np.eye(per_world, dtype=bool)[None, :, None, :]
+            return np.where(own, INF_DISTANCE, dist).min(axis=3).reshape(options.shape)
+
+        distance = np.empty_like(options)
+        occupancy = self.occupancy.reshape(worlds, self.num_cells)
+        for w in range(worlds):
+            agents = slice(w * per_world, (w + 1) * per_world)
+            cell, world_options = self.cell[agents], options[agents]
+            d1, l1, d2 = nearest_distance_field(np.flatnonzero(occupancy[w]),
+                                                self.width, self.height)
+            # Ignore the agent's own cell unless another agent shares it
+            shared = occupancy[w][cell] > 1
+            use_nearest = shared[:, None] | (l1[world_options] != cell[:, None])
+            distance[agents] = np.where(use_nearest, d1[world_options], d2[world_options])
+        return distance
+
+    def resolve_conflicts(self, intended, options, safe, unvisited):
+        """Send every agent but the fittest of each contested cell elsewhere"""
+        claims = self.slots(intended)
+        counts = np.bincount(claims, minlength=len(self.occupancy))
+        contested = np.flatnonzero(counts[claims] > 1)
+        if not len(contested):
+            return
+        if self.metrics is not None:
+            groups = len(np.unique(claims[contested]))
+            self.metrics.record_conflicts(groups, len(contested) - groups)
+        if self.resolver == "exclusive":
+            self.resolve_exclusive(intended, options, safe, unvisited, claims, contested)
+            return
+
+        # Groups are handled in order of their first claimant, like the dict
+        # in EvolvingModel.resolve_move_conflicts, then by fitness
+        destinations, first = np.unique(claims[contested], return_index=True)
+        rank = np.empty(len(first), dtype=np.int64)
+        rank[np.argsort(first)] = np.arange(len(first))
+        group = rank[np.searchsorted(destinations, claims[contested])]
+        fitness = self.visited_counts()[contested]
+        order = np.lexsort((contested, -fitness, group))
+        ranked, group = contested[order], group[order]
+        losers = ranked[1:][group[1:] == group[:-1]]
+
+        for i in losers:
+            pool = safe[i] & (options[i] != intended[i])
+            if not pool.any():
+                intended[i] = self.cell[i]
+                continue
+            unvisited_pool = pool & unvisited[i]
+            if unvisited_pool.any():
+                pool = unvisited_pool
+            choices = np.flatnonzero(pool)
+            rng = self.rngs[i // self.agents_per_world]
+            intended[i] = options[i, choices[rng.randrange(len(choices))]]
+
+    def resolve_exclusive(self, intended, options, safe, unvisited, claims, contested):
+        """EvolvingModel.resolve_exclusive for all worlds: one pass over the claimed cells"""
+        per_world = self.agents_per_world
+        # One salt per world with a conflict, drawn before its losers pick
+        salt = np.zeros(self.num_worlds, dtype=np.int64)
+        for w in np.unique(self.world[contested]).tolist():
+            salt[w] = self.rngs[w].getrandbits(32)
+        tie = tie_break_key(contested % per_world, salt[self.world[contested]])
+        fitness = self.visited_counts()[contested]
+
+        # The first claimant of each cell in priority order keeps it
+        order = np.lexsort((tie, -fitness, claims[contested]))
+        destination = claims[contested[order]]
+        lost = np.r_[False, destination[1:] == destination[:-1]]
+        losers = contested[order][lost]
+        losers = losers[np.lexsort((tie[order][lost], -fitness[order][lost]))]
+
+        claimed = np.zeros(len(self.occupancy), dtype=bool)
+        claimed[claims] = True
+        for i in losers:
+            base = self.world[i] * self.num_cells
+            pool = safe[i] & ~claimed[base + options[i]]
+            if not pool.any():
+                intended[i] = self.cell[i]
+                continue
+            unvisited_pool = pool & unvisited[i]
+            if unvisited_pool.any():
+                pool = unvisited_pool
+            choices = np.flatnonzero(pool)
+            rng = self.rngs[i // per_world]
+            intended[i] = options[i, choices[rng.randrange(len(choices))]]
+            claimed[base + intended[i]] = True
@@ -0,0 +1,585 @@
+import atexit
+import math
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from engine import ArrayEngine
+from topology import get_topology
+from core import HeadlessModel
+from cache import FitnessCache
+from metrics import StepMetrics
+from surrogate import FitnessSurrogate
+from utils import decode_genome
+from config import *  # Import all configuration constants
+
+_pool = None
+_pool_workers = 0
+_workers = None  # Overrides GA_WORKERS when set (see set_worker_count)
+_cache = None
+_models = {}  # Pooled models, keyed by grid size, agent count, engine and resolver
+_metrics = None
+_surrogate = None
+_steps_run = 0
+_steps_budget = 0
+_agent_steps = 0  # Agent-steps simulated since the last take_agent_steps()
+_baseline_agent_steps = 0  # ... and what the fixed evaluation (every seed, full run) would have cost
+_saturated_rungs = set()  # Racing rungs already warned about
+_truncated = {}  # Solution -> (threshold, seeds, horizon) of candidates whose runs were stopped early
+
+def simulate(solution, seed=None, stop_below=None, horizon=None):
+    """Run one fitness simulation and return (fitness, steps run, exact)
+
+    The run lasts `horizon` steps (SIMULATION_STEPS by default). With
+    GA_EARLY_STOP it ends as soon as no agent can add a cell, which keeps
+    the fitness exact, or once it can no longer reach `stop_below`, in
+    which case the fitness so far is returned with exact=False.
+    """
+    horizon = horizon or SIMULATION_STEPS
+    genomes = [solution for _ in range(NUM_AGENTS)]
+    model = get_model(genomes, seed)
+    if not GA_EARLY_STOP:
+        for _ in range(horizon):
+            model.step()
+        return model.get_total_fitness(), horizon, True
+    steps = model.run(horizon, stop_below)
+    fitness = model.get_total_fitness()
+    exact = model.fitness_bound(horizon - steps) == fitness
+    return fitness, steps, exact
+
+def simulate_batch(solutions, seeds, stops=None, horizon=None):
+    """Simulate one world per (solution, seed) pair in lockstep on the array engine
+
+    Returns a (fitness, steps run, exact) tuple per world, the same as
+    simulate gives for that solution, seed and horizon. Worlds that finish
+    early are dropped from the batch while the others carry on.
+    """
+    horizon = horizon or SIMULATION_STEPS
+    worlds = [[solution for _ in range(NUM_AGENTS)] for solution in solutions]
+    # Seeded like Model.__new__, so each world repeats its single-model run
+    rngs = [random.Random(seed if seed is not None else random.random()) for seed in seeds]
+    metrics = get_metrics()
+    if metrics is not None:
+        metrics.start_run()
+    engine = ArrayEngine(worlds, get_topology(GRID_WIDTH, GRID_HEIGHT), rngs,
+                         CONFLICT_RESOLVER, metrics)
+    if not GA_EARLY_STOP:
+        for _ in range(horizon):
+            engine.step()
+        return [(fitness, horizon, True) for fitness in engine.world_fitness().tolist()]
+
+    stops = [stop if stop is not None else -np.inf for stop in (stops or [None] * len(worlds))]
+    stop_below = np.array(stops, dtype=float)
+    active = np.arange(len(worlds))  # Batch index of each world still running
+    results = [None] * len(worlds)
+    for step in range(horizon + 1):
+        fitness = engine.world_fitness()
+        bound = engine.fitness_bound(horizon - step)
+        exact = bound == fitness
+        done = exact | (bound < stop_below)
+        for w in np.flatnonzero(done).tolist():
+            results[active[w]] = (int(fitness[w]), step, bool(exact[w]))
+        if done.all():
+            break
+        if done.any():
+            engine.keep_worlds(np.flatnonzero(~done))
+            active, stop_below = active[~done], stop_below[~done]
+        engine.step()
+    return results
+
+def get_model(genomes, seed=None):
+    """This process's reusable model, reset for a new run with `genomes`
+
+    One quiet model is kept per grid size, agent count, engine and resolver, so
+    repeated evaluations reuse its grid, agents and tables instead of
+    rebuilding them. The numpy engine runs on the Mesa-free HeadlessModel;
+    Mesa is only imported for the per-agent engine.
+    """
+    key = (GRID_WIDTH, GRID_HEIGHT, len(genomes), SIMULATION_ENGINE, CONFLICT_RESOLVER)
+    model = _models.get(key)
+    if model is None and SIMULATION_ENGINE == "numpy":
+        model = HeadlessModel(genomes, width=GRID_WIDTH, height=GRID_HEIGHT,
+                              seed=seed, resolver=CONFLICT_RESOLVER, metrics=get_metrics())
+        _models[key] = model
+    elif model is None:
+        from model import EvolvingModel
+        model = EvolvingModel(genomes, width=GRID_WIDTH, height=GRID_HEIGHT,
+                              engine=SIMULATION_ENGINE, seed=seed, verbose=False,
+                              resolver=CONFLICT_RESOLVER, metrics=get_metrics())
+        _models[key] = model
+    else:
+        model.reset(genomes, seed)
+    return model
+
+def evaluation_seeds():
+    """Seeds every candidate is simulated with
+
+    In common-random-numbers mode (GA_CRN_SEEDS > 0) all candidates share the
+    same GA_CRN_SEEDS seeds, counted up from GA_SEED (or 0), so differences in
+    fitness come from the genomes rather than the draws.
+    """
+    if GA_CRN_SEEDS > 0:
+        return common_seeds(GA_CRN_SEEDS)
+    return [GA_SEED]
+
+def scoring_seeds():
+    """Seeds a candidate's final fitness is simulated with (the last rung's when racing)"""
+    if GA_RACING:
+        return common_seeds(GA_RACING_RUNGS[-1][1])
+    return evaluation_seeds()
+
+def common_seeds(count):
+    """`count` seeds shared by all candidates, counted up from GA_SEED (or 0)"""
+    base = GA_SEED if GA_SEED is not None else 0
+    return [base + k for k in range(count)]
+
+def phenotype_key(solution, seed, horizon=None):
+    """Cache key for the behaviour a genome produces under the current settings"""
+    speed, exploration_chance = decode_genome(solution)
+    level = round(exploration_chance / FITNESS_CACHE_QUANTUM)
+    return (speed, level, GRID_WIDTH, GRID_HEIGHT, NUM_AGENTS, horizon or SIMULATION_STEPS,
+            CONFLICT_RESOLVER, seed)
+
+def phenotype_genome(key):
+    """Representative genome for a phenotype key"""
+    speed, level = key[:2]
+    return [speed, min(1.0, level * FITNESS_CACHE_QUANTUM)]
+
+def evaluate_key(key, stop_below=None):
+    """Simulate the representative genome of a phenotype key"""
+    return simulate(phenotype_genome(key), key[-1], stop_below, horizon=key[5])
+
+def evaluate_keys(keys, stops):
+    """Simulate several phenotype keys, as one batch of worlds per horizon with GA_BATCH_WORLDS"""
+    if not GA_BATCH_WORLDS:
+        return [evaluate_key(key, stop) for key, stop in zip(keys, stops)]
+    results = [None] * len(keys)
+    for horizon in sorted({key[5] for key in keys}):
+        batch = [i for i, key in enumerate(keys) if key[5] == horizon]
+        for i, result in zip(batch, simulate_batch([phenotype_genome(keys[i]) for i in batch],
+                                                   [keys[i][-1] for i in batch],
+                                                   [stops[i] for i in batch], horizon)):
+            results[i] = result
+    return results
+
+def evaluate_chunk(keys, stops):
+    """evaluate_keys in a worker process, handing back the metrics it recorded"""
+    results = evaluate_keys(keys, stops)
+    metrics = get_metrics()
+    if metrics is None:
+        return results, None
+    recorded = StepMetrics()
+    recorded.merge(metrics)
+    metrics.clear()
+    return results, recorded
+
+def run_keys(keys, stops):
+    """evaluate_keys, split into one chunk per worker process when there are several"""
+    workers = min(worker_count(), len(keys))
+    if workers <= 1:
+        return evaluate_keys(keys, stops) if keys else []
+    size = -(-len(keys) // workers)
+    starts = range(0, len(keys), size)
+    chunks = get_pool(worker_count()).map(
+        evaluate_chunk, [keys[i:i + size] for i in starts], [stops[i:i + size] for i in starts])
+    results = []
+    for chunk, recorded in chunks:
+        results.extend(chunk)
+        if recorded is not None:
+            get_metrics().merge(recorded)
+    return results
+
+def max_run_fitness(horizon=None):
+    """Highest fitness a single simulation can return"""
+    cells = min(GRID_WIDTH * GRID_HEIGHT, (horizon or SIMULATION_STEPS) + 1)
+    return NUM_AGENTS * (cells + 1)
+
+def parent_threshold(ga_instance):
+    """Fitness of the worst parent selected from the previous generation"""
+    if ga_instance is None:
+        return None
+    fitness = getattr(ga_instance, "last_generation_fitness", None)
+    if fitness is None or len(fitness) < GA_PARENTS_MATING:
+        return None
+    return sorted(fitness)[-GA_PARENTS_MATING]
+
+def survivor_threshold(ga_instance):
+    """parent_threshold, which runs stop below when GA_EARLY_STOP is on"""
+    return parent_threshold(ga_instance) if GA_EARLY_STOP else None
+
+def run_threshold(threshold, known, remaining, num_seeds, horizon=None):
+    """stop_below for one of `remaining` unsimulated seeds of a candidate
+
+    The candidate's mean over num_seeds runs must reach `threshold`; the
+    runs already `known` and the best case for the other remaining ones
+    decide how much this run has to contribute.
+    """
+    if threshold is None:
+        return None
+    needed = threshold * num_seeds - sum(known) - (remaining - 1) * max_run_fitness(horizon)
+    return needed if needed > 0 else None
+
+def record_steps(steps_run, runs=1, horizon=None):
+    """Account simulated steps against the full budget of `horizon` steps per run"""
+    global _steps_run, _steps_budget, _agent_steps
+    _steps_run += steps_run
+    _steps_budget += runs * (horizon or SIMULATION_STEPS)
+    _agent_steps += steps_run * NUM_AGENTS
+
+def step_savings():
+    """Return (steps saved by early stopping, steps budgeted)"""
+    return _steps_budget - _steps_run, _steps_budget
+
+def take_step_counts():
+    """Return (steps simulated, steps budgeted) since the previous call"""
+    global _steps_run, _steps_budget
+    counts = (_steps_run, _steps_budget)
+    _steps_run = _steps_budget = 0
+    return counts
+
+def add_step_counts(steps_run, steps_budget):
+    """Add step counts taken in another process (e.g. an island) to this one's"""
+    global _steps_run, _steps_budget
+    _steps_run += steps_run
+    _steps_budget += steps_budget
+
+def record_baseline(candidates, seeds, horizon):
+    """Account what scoring `candidates` on every seed for the full horizon would cost"""
+    global _baseline_agent_steps
+    _baseline_agent_steps += candidates * seeds * horizon * NUM_AGENTS
+
+def take_agent_steps():
+    """Return (agent-steps simulated, agent-steps the fixed evaluation would take) since the previous call"""
+    global _agent_steps, _baseline_agent_steps
+    usage = (_agent_steps, _baseline_agent_steps)
+    _agent_steps = _baseline_agent_steps = 0
+    return usage
+
+def get_cache():
+    """Return the shared fitness cache, loading the on-disk store on first use"""
+    global _cache
+    if _cache is None:
+        path = None
+        if FITNESS_CACHE_FILE:
+            path = os.path.join(os.path.dirname(GENOME_SAVE_FILE), FITNESS_CACHE_FILE)
+        _cache = FitnessCache(FITNESS_CACHE_SIZE, path)
+    return _cache
+
+def get_metrics():
+    """This process's StepMetrics while PROFILE_STEPS is on, otherwise None"""
+    global _metrics
+    if PROFILE_STEPS and _metrics is None:
+        _metrics = StepMetrics()
+    return _metrics if PROFILE_STEPS else None
+
+def get_surrogate():
+    """Return the shared fitness surrogate"""
+    global _surrogate
+    if _surrogate is None:
+        _surrogate = FitnessSurrogate(SURROGATE_DEGREE, SURROGATE_MIN_SAMPLES)
+    return _surrogate
+
+def screen_candidates(keys, results, ga_instance):
+    """Decide which candidates the surrogate lets skip simulation
+
+    A phenotype is screened out when its predicted fitness, raised by
+    SURROGATE_MARGIN residual spreads, still falls short of the worst
+    parent. Every SURROGATE_AUDIT_EVERY-th screened-out phenotype is
+    simulated anyway so its prediction can be checked. Returns
+    ({phenotype: prediction} to skip, {phenotype: prediction} to audit).
+    """
+    skipped, audits = {}, {}
+    threshold = parent_threshold(ga_instance)
+    if threshold is None:
+        return skipped, audits
+    surrogate = get_surrogate()
+    for solution_keys in keys:
+        phenotype = solution_keys[0][:2]
+        if phenotype in skipped or phenotype in audits:
+            continue
+        missing = sum(results[key] is None for key in solution_keys)
+        if not missing:
+            continue  # Cached, so already free
+        speed, level = phenotype
+        prediction = surrogate.predict(speed, level * FITNESS_CACHE_QUANTUM)
+        if prediction is None:
+            continue
+        value, spread = prediction
+        if value + SURROGATE_MARGIN * spread >= threshold:
+            continue
+        if surrogate.screen_out(SURROGATE_AUDIT_EVERY):
+            audits[phenotype] = value
+        else:
+            skipped[phenotype] = value
+            surrogate.record_skip(missing)
+    return skipped, audits
+
+def train_surrogate(keys, results, exact, audits):
+    """Feed exactly known candidate fitness to the surrogate and score its audits"""
+    surrogate = get_surrogate()
+    for solution_keys in keys:
+        if not all(key in exact for key in solution_keys):
+            continue
+        speed, level = solution_keys[0][:2]
+        fitness = sum(results[key] for key in solution_keys) / len(solution_keys)
+        if (speed, level) in audits:
+            surrogate.record_audit(audits.pop((speed, level)), fitness)
+        surrogate.observe(speed, level * FITNESS_CACHE_QUANTUM, fitness)
+
+def metrics_path():
+    """Where the profiling summary of a GA run is written"""
+    return os.path.join(os.path.dirname(GENOME_SAVE_FILE), METRICS_FILE)
+
+def set_cache(cache):
+    """Replace the shared fitness cache (an empty FitnessCache(0) forces every simulation)"""
+    global _cache
+    _cache = cache
+
+def cached_fitness(key):
+    """Cached fitness of a phenotype key, or None
+
+    Unseeded runs (seed None) are one random draw each, so caching them
+    would freeze that draw's luck for every later candidate and run.
+    """
+    if key[-1] is None:
+        return None
+    return get_cache().get(key)
+
+def cache_fitness(key, fitness):
+    """Store an exact fitness, unless the run was unseeded (see cached_fitness)"""
+    if key[-1] is not None:
+        get_cache().put(key, fitness)
+
+def fitness_func(ga_instance, solution, solution_idx):
+    """Fitness function for genetic algorithm (mean over the evaluation seeds)"""
+    if GA_SURROGATE:
+        return batch_fitness_func(ga_instance, [solution], [solution_idx])[0]
+    seeds = evaluation_seeds()
+    record_baseline(1, len(seeds), SIMULATION_STEPS)
+    threshold = survivor_threshold(ga_instance)
+    values = []
+    for i, seed in enumerate(seeds):
+        key = phenotype_key(solution, seed)
+        fitness = cached_fitness(key)
+        if fitness is None:
+            stop_below = run_threshold(threshold, values, len(seeds) - i, len(seeds))
+            fitness, steps, exact = evaluate_key(key, stop_below)
+            record_steps(steps)
+            if not exact:
+                # Cannot reach the survivors whatever the other seeds give
+                record_steps(0, runs=len(seeds) - i - 1)
+                record_truncated(solution, threshold, seeds, SIMULATION_STEPS)
+                values.append(fitness)
+                break
+            cache_fitness(key, fitness)
+        values.append(fitness)
+    return sum(values) / len(seeds)
+
+def batch_fitness_func(ga_instance, solutions, solution_indices):
+    """Batch fitness function: new candidates are simulated together, across the worker pool"""
+    if GA_RACING:
+        return race(ga_instance, solutions)
+    seeds = evaluation_seeds()
+    record_baseline(len(solutions), len(seeds), SIMULATION_STEPS)
+    return score_candidates(ga_instance, solutions, seeds, SIMULATION_STEPS,
+                            survivor_threshold(ga_instance), GA_SURROGATE)
+
+def score_candidates(ga_instance, solutions, seeds, horizon, threshold, screen=False):
+    """Mean fitness of each solution over `seeds` runs of `horizon` steps
+
+    Known results come from the cache and the rest are simulated in one
+    batch. Runs stop early below `threshold` (see run_threshold), and with
+    `screen` the surrogate may stand in for candidates it rates as hopeless.
+    """
+    keys = [[phenotype_key(solution, seed, horizon) for seed in seeds] for solution in solutions]
+    results = {}
+    for solution_keys in keys:
+        for key in solution_keys:
+            if key not in results:
+                results[key] = cached_fitness(key)
+    exact = {key for key, fitness in results.items() if fitness is not None}
+    skipped, audits = screen_candidates(keys, results, ga_instance) if screen else ({}, {})
+
+    # Thresholds use only what is already known about each candidate
+    stops = {}
+    for solution_keys in keys:
+        phenotype = solution_keys[0][:2]
+        if phenotype in skipped:
+            continue
+        if phenotype in audits:
+            # Audits run to the end so the prediction is checked against exact fitness
+            stops.update((key, None) for key in solution_keys if results[key] is None)
+            continue
+        known = [results[key] for key in solution_keys if results[key] is not None]
+        remaining = len(seeds) - len(known)
+        for key in solution_keys:
+            if results[key] is None:
+                stops[key] = run_threshold(threshold, known, remaining, len(seeds), horizon)
+
+    missing = list(stops)
+    for key, (fitness, steps, run_exact) in zip(
+            missing, run_keys(missing, [stops[key] for key in missing])):
+        record_steps(steps, horizon=horizon)
+        if run_exact:
+            cache_fitness(key, fitness)
+            exact.add(key)
+        results[key] = fitness
+    if screen:
+        train_surrogate(keys, results, exact, audits)
+    for solution, solution_keys in zip(solutions, keys):
+        if solution_keys[0][:2] not in skipped and not all(key in exact for key in solution_keys):
+            record_truncated(solution, threshold, seeds, horizon)
+    return [skipped[solution_keys[0][:2]] if solution_keys[0][:2] in skipped
+            else sum(results[key] for key in solution_keys) / len(seeds)
+            for solution_keys in keys]
+
+def race(ga_instance, solutions):
+    """Successive-halving fitness: short cheap runs first, longer and more seeds for the best
+
+    Every candidate is scored on the first rung of GA_RACING_RUNGS; the best
+    GA_RACING_PROMOTE fraction of them moves on to the next rung, and so on;
+    when more candidates than that reach the rung's cap, all of those move on.
+    Each candidate keeps the fitness of the last rung it reached, which is
+    the full-fidelity score for those promoted to the end. Candidates
+    knocked out earlier are scored on fewer steps, so on common seeds they
+    can only be undercounted relative to the full run. Equal scores are
+    ranked by a seeded shuffle rather than by position in the batch.
+    """
+    check_racing_rungs()
+    generation = getattr(ga_instance, "generations_completed", 0)
+    alive = list(range(len(solutions)))
+    fitness = [0.0] * len(solutions)
+    # Measured against the evaluation racing replaces: one full run per evaluation seed
+    record_baseline(len(solutions), len(evaluation_seeds()), SIMULATION_STEPS)
+    for rung, (horizon, num_seeds) in enumerate(GA_RACING_RUNGS):
+        last = rung == len(GA_RACING_RUNGS) - 1
+        # Only the final rung is on the survivors' scale, so only it stops early against them
+        threshold = survivor_threshold(ga_instance) if last else None
+        scores = score_candidates(ga_instance, [solutions[i] for i in alive],
+                                  common_seeds(num_seeds), horizon, threshold,
+                                  GA_SURROGATE and last)
+        for i, score in zip(alive, scores):
+            fitness[i] = score
+        if last:
+            break
+        promoted = max(1, math.ceil(len(alive) * GA_RACING_PROMOTE))
+        capped = sum(fitness[i] >= max_run_fitness(horizon) for i in alive)
+        if capped > promoted:
+            # The rung cannot rank candidates at its cap, so none of them is knocked out
+            warn_saturated(rung, horizon, capped, len(alive))
+            promoted = capped
+        tie_break = random.Random(None if GA_SEED is None else f"{GA_SEED}:{generation}:{rung}")
+        order = {i: tie_break.random() for i in alive}
+        alive = sorted(alive, key=lambda i: (fitness[i], order[i]), reverse=True)[:promoted]
+    return fitness
+
+def check_racing_rungs():
+    """Refuse a GA_RACING_RUNGS schedule whose horizons and seeds do not grow rung by rung"""
+    if not GA_RACING_RUNGS:
+        raise ValueError("GA_RACING_RUNGS needs at least one (steps, seeds) rung")
+    if not 0 < GA_RACING_PROMOTE <= 1:
+        raise ValueError(f"GA_RACING_PROMOTE must be in (0, 1], got {GA_RACING_PROMOTE}")
+    for (steps, seeds), (next_steps, next_seeds) in zip(GA_RACING_RUNGS, GA_RACING_RUNGS[1:]):
+        if next_steps < steps or next_seeds < seeds or (next_steps, next_seeds) == (steps, seeds):
+            raise ValueError(f"GA_RACING_RUNGS must grow from rung to rung, got {GA_RACING_RUNGS}")
+
+def warn_saturated(rung, horizon, capped, candidates):
+    """Say once per rung that it cannot rank the candidates it is meant to filter"""
+    if rung in _saturated_rungs:
+        return
+    _saturated_rungs.add(rung)
+    print(f"⚠️  Racing rung {rung + 1} ({horizon} steps) is saturated: {capped} of {candidates} "
+          f"candidates reach its cap of {max_run_fitness(horizon)}, so all of them are promoted. "
+          f"Lengthen the rung or use a larger grid.")
+
+def solution_key(solution):
+    return tuple(float(gene) for gene in solution)
+
+def record_truncated(solution, threshold, seeds, horizon):
+    """Remember a candidate whose fitness is only a partial run (see settle_truncated)"""
+    _truncated[solution_key(solution)] = (threshold, tuple(seeds), horizon)
+
+def truncated_mask(population):
+    """Bool per solution: is its current fitness from runs stopped early"""
+    return np.array([solution_key(solution) in _truncated for solution in population], dtype=bool)
+
+def settle_truncated(ga_instance, fitness):
+    """pygad on_fitness hook: give stopped runs their real fitness when selection could pick them
+
+    A run is only stopped once its candidate cannot reach the threshold,
+    the worst parent fitness of the generation before. While at least
+    GA_PARENTS_MATING exactly scored members reach that threshold, every
+    parent and the elite are exact and the partial values never matter.
+    Otherwise the stopped candidates are simulated to the end, so parents
+    are picked on true fitness rather than on how early a run was cut.
+    Returns the corrected fitness, or None when nothing changes.
+    """
+    keys = [solution_key(solution) for solution in ga_instance.population]
+    for key in set(_truncated) - set(keys):
+        del _truncated[key]  # Left the population
+    pending = [i for i, key in enumerate(keys) if key in _truncated]
+    if not pending:
+        return None
+    fitness = np.array(fitness, dtype=float)
+    threshold = max(_truncated[keys[i]][0] for i in pending)
+    exact = np.ones(len(fitness), dtype=bool)
+    exact[pending] = False
+    if np.count_nonzero(fitness[exact] >= threshold) >= GA_PARENTS_MATING:
+        return None
+
+    groups = {}
+    for i in pending:
+        _, seeds, horizon = _truncated[keys[i]]
+        groups.setdefault((seeds, horizon), []).append(i)
+    for (seeds, horizon), members in groups.items():
+        scores = score_candidates(ga_instance, [ga_instance.population[i] for i in members],
+                                  list(seeds), horizon, None)
+        for i, score in zip(members, scores):
+            fitness[i] = score
+    for i in pending:
+        _truncated.pop(keys[i], None)
+    return fitness
+
+def worker_count():
+    """Number of evaluation processes configured by GA_WORKERS (0 = all cores)"""
+    workers = _workers if _workers is not None else GA_WORKERS
+    return workers if workers > 0 else (os.cpu_count() or 1)
+
+def set_worker_count(workers):
+    """Override GA_WORKERS in this process (islands evaluate their own population serially)"""
+    global _workers
+    _workers = workers
+
+def fitness_settings():
+    """pygad keyword arguments for serial or parallel fitness evaluation
+
+    Includes the on_fitness hook that settles runs stopped early; callers
+    with their own on_fitness should chain settle_truncated.
+    """
+    if GA_BATCH_WORLDS or GA_RACING or worker_count() > 1:
+        # One batch per generation so the whole population is simulated at once
+        return {"fitness_func": batch_fitness_func, "fitness_batch_size": GA_POPULATION_SIZE,
+                "on_fitness": settle_truncated}
+    return {"fitness_func": fitness_func, "on_fitness": settle_truncated}
+
+def _init_worker():
+    """Give each forked worker its own random stream"""
+    random.seed()
+
+def get_pool(workers):
+    """Return the shared process pool, starting it on first use"""
+    global _pool, _pool_workers
+    if _pool is None or _pool_workers != workers:
+        shutdown_pool()
+        _pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker)
+        _pool_workers = workers
+    return _pool
+
+def shutdown_pool():
+    """Stop the worker processes, if any"""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown()
+        _pool = None
+
+atexit.register(shutdown_pool)
@@ -0,0 +1,166 @@
+"""Island-model GA: independent pygad populations in separate processes
+
+Islands sit on a ring. Every GA_MIGRATION_INTERVAL generations each one
+sends copies of its GA_MIGRANTS best genomes to the next island and
+replaces its own worst genomes with the ones it receives. Islands only
+talk through queue objects (put/get), so the local multiprocessing
+queues can be swapped for manager- or socket-backed queues to span hosts.
+"""
+import multiprocessing
+import queue
+import numpy as np
+import evaluation
+from evaluation import (get_cache, get_metrics, get_surrogate, set_worker_count, take_step_counts,
+                        add_step_counts)
+from checkpoint import load_checkpoint
+from utils import save_genome
+from config import *  # Import all configuration constants
+
+MIGRATION_TIMEOUT = 600  # Seconds to wait for a neighbour's migrants before carrying on
+RESULT_POLL_INTERVAL = 5  # Seconds between checks that no island has died
+
+def island_seed(index):
+    """GA seed of an island, derived from GA_SEED so seeded runs stay reproducible"""
+    return None if GA_SEED is None else GA_SEED + index
+
+def emigrants(ga_instance):
+    """Copies of the island's GA_MIGRANTS best genomes, with their fitness"""
+    fitness = np.asarray(ga_instance.last_generation_fitness, dtype=float)
+    best = np.argsort(fitness)[::-1][:GA_MIGRANTS]
+    return ga_instance.population[best].copy(), fitness[best]
+
+def immigrate(ga_instance, genomes, fitness):
+    """Replace the island's worst genomes with migrants, keeping their known fitness"""
+    current = np.asarray(ga_instance.last_generation_fitness, dtype=float)
+    worst = np.argsort(current)[:len(genomes)]
+    ga_instance.population[worst] = genomes
+    current[worst] = fitness
+    ga_instance.last_generation_fitness = current
+
+def run_island(index, inbox, outbox, results):
+    """Evolve one island, exchanging migrants with its ring neighbours
+
+    Puts (index, best solution, best fitness, cache hits, cache misses, new
+    cache entries, StepMetrics or None, early-stopping step counts,
+    surrogate) on `results`, so the parent keeps the island's evaluations
+    and their accounting as it would its own.
+    """
+    import main
+    set_worker_count(1)  # Islands are the parallelism; evaluate serially inside each
+    main.set_island(index)
+    cache = get_cache()
+    inherited = set(cache.entries)
+    cache.hits = cache.misses = 0  # Count this island's lookups only
+    metrics = get_metrics()
+    if metrics is not None:
+        metrics.clear()  # Forked after the parent's own profiling began
+    take_step_counts()
+    surrogate = get_surrogate()
+    surrogate.reset_counts()
+
+    def on_generation(ga_instance):
+        if ga_instance.generations_completed % GA_MIGRATION_INTERVAL == 0:
+            outbox.put(emigrants(ga_instance))
+            try:
+                immigrate(ga_instance, *inbox.get(timeout=MIGRATION_TIMEOUT))
+            except queue.Empty:
+                print(f"⚠️  Island {index}: no migrants arrived, continuing without them")
+        # Checkpoint after migrating, so a resumed island keeps the migrants it received
+        main.on_generation(ga_instance)
+
+    solution, fitness = main.evolve(random_seed=island_seed(index), on_generation=on_generation)
+    entries = [(key, value) for key, value in cache.entries.items() if key not in inherited]
+    results.put((index, np.asarray(solution).tolist(), float(fitness), cache.hits, cache.misses,
+                 entries, metrics, take_step_counts(), surrogate))
+
+def collect_results(processes, results):
+    """Wait for every island's result, failing fast if an island dies without one"""
+    finished = {}
+    while len(finished) < len(processes):
+        try:
+            result = results.get(timeout=RESULT_POLL_INTERVAL)
+            finished[result[0]] = result
+            continue
+        except queue.Empty:
+            pass
+        exited = [i for i, process in enumerate(processes)
+                  if i not in finished and process.exitcode is not None]
+        # An island that exited cleanly flushed its result first; read anything still queued
+        try:
+            while True:
+                result = results.get(timeout=1)
+                finished[result[0]] = result
+        except queue.Empty:
+            pass
+        failed = [i for i in exited if i not in finished]
+        if failed:
+            for process in processes:
+                if process.is_alive():
+                    process.terminate()
+            codes = ", ".join(f"island {i} (exit code {processes[i].exitcode})" for i in failed)
+            raise RuntimeError(f"Island evolution failed: {codes} stopped without a result")
+    return [finished[i] for i in sorted(finished)]
+
+def check_resume(num_islands):
+    """Refuse to resume islands whose checkpoints are from different generations
+
+    Islands checkpoint independently, so an interrupted run can leave some
+    a checkpoint ahead of the others. Resuming those would replay
+    migrations out of step, so the run is only resumed when every island
+    restarts from the same generation.
+    """
+    import main
+    generations = {}
+    for i in range(num_islands):
+        checkpoint = load_checkpoint(main.checkpoint_path(i))
+        generations[i] = None if checkpoint is None else int(checkpoint["generation"])
+    if len(set(generations.values())) > 1:
+        found = ", ".join(f"island {i}: {'none' if generation is None else f'generation {generation}'}"
+                          for i, generation in generations.items())
+        raise RuntimeError(f"Island checkpoints are out of step ({found}); "
+                           f"delete them or set GA_RESUME = \"seed\" to start from their populations")
+
+def run_islands(num_islands=None):
+    """Evolve GA_ISLANDS populations in parallel and return (best solution, best fitness)"""
+    num_islands = num_islands or GA_ISLANDS
+    if GA_RESUME == "resume":
+        check_resume(num_islands)
+    if VERBOSE_GA:
+        print(f"🏝️  Evolving {num_islands} islands of {GA_POPULATION_SIZE}, "
+              f"migrating {GA_MIGRANTS} genomes every {GA_MIGRATION_INTERVAL} generations")
+    evaluation.shutdown_pool()  # Forked islands must not inherit a running pool
+    inboxes = [multiprocessing.Queue() for _ in range(num_islands)]
+    results = multiprocessing.Queue()
+    processes = [
+        multiprocessing.Process(target=run_island,
+                                args=(i, inboxes[i], inboxes[(i + 1) % num_islands], results))
+        for i in range(num_islands)
+    ]
+    for process in processes:
+        process.start()
+    finished = collect_results(processes, results)
+    for process in processes:
+        process.join()
+
+    cache = get_cache()
+    metrics = get_metrics()
+    surrogate = get_surrogate()
+    for index, solution, fitness, hits, misses, entries, recorded, steps, screened in finished:
+        if VERBOSE_GA:
+            print(f"   Island {index}: best fitness {fitness:.1f} "
+                  f"({hits} cache hits, {misses} misses)")
+        for key, value in entries:
+            cache.put(key, value)
+        cache.hits += hits
+        cache.misses += misses
+        if metrics is not None and recorded is not None:
+            metrics.merge(recorded)
+        add_step_counts(*steps)
+        surrogate.merge(screened)
+    _, solution, fitness, *_ = max(finished, key=lambda result: result[2])
+    return np.array(solution), fitness
+
+if __name__ == '__main__':
+    best_solution, best_fitness = run_islands(max(GA_ISLANDS, 2))
+    print(f"🏆 Best Fitness: {best_fitness:.1f} cells explored")
+    save_genome(best_solution.tolist())
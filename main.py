@@ -1,32 +1,70 @@
-import pygad
-import numpy as np
-from model import EvolvingModel
-from visualization import launch_visualization
+import os
 from utils import save_genome, load_genome
+from checkpoint import save_checkpoint, load_checkpoint, resume, reuse_fitness, best_of
+from evaluation import (fitness_settings, worker_count, get_cache, step_savings, get_metrics,
+                        metrics_path, get_surrogate, take_agent_steps, settle_truncated,
+                        truncated_mask)
 from config import *  # Import all configuration constants
 
-def fitness_func(ga_instance, solution, solution_idx):
-    """Fitness function for genetic algorithm"""
-    # Create multiple agents with the same genome
-    genomes = [solution for _ in range(NUM_AGENTS)]
-    model = EvolvingModel(genomes, width=GRID_WIDTH, height=GRID_HEIGHT)
-    
-    # Run simulation
-    for _ in range(SIMULATION_STEPS):
-        model.step()
-    
-    # Return total fitness (unique cells explored)
-    return model.get_total_fitness()
+_island = None  # Index of the island this process evolves, in island mode
 
-def run_genetic_algorithm():
-    """Run genetic algorithm to evolve optimal genome"""
-    if VERBOSE_GA:
-        print("🧬 Starting Genetic Algorithm Evolution...")
-    
-    ga_instance = pygad.GA(
-        num_generations=GA_GENERATIONS,
+def set_island(index):
+    """Mark this process as evolving island `index` (see islands.run_island)"""
+    global _island
+    _island = index
+
+def checkpoint_path(island=None):
+    """Where GA checkpoints are written (next to GENOME_SAVE_FILE), or None when disabled
+
+    Each island checkpoints to its own file, e.g. ga_checkpoint.island2.npz;
+    `island` defaults to the one this process evolves.
+    """
+    if not GA_CHECKPOINT_FILE:
+        return None
+    name = GA_CHECKPOINT_FILE
+    island = _island if island is None else island
+    if island is not None:
+        stem, ext = os.path.splitext(name)
+        name = f"{stem}.island{island}{ext}"
+    return os.path.join(os.path.dirname(GENOME_SAVE_FILE), name)
+
+def on_fitness(ga_instance, fitness):
+    """Settle runs stopped early, and log the racing cost of the initial population"""
+    fitness = settle_truncated(ga_instance, fitness)
+    if GA_RACING and VERBOSE_GA and ga_instance.generations_completed == 0:
+        log_agent_steps("Initial population")
+    return fitness
+
+def log_agent_steps(label):
+    if _island is not None:
+        label = f"Island {_island} {label[0].lower()}{label[1:]}"
+    used, baseline = take_agent_steps()
+    if baseline:
+        print(f"   {label}: simulated {used:,} agent-steps, "
+              f"{baseline:,} without racing ({used / baseline:.0%})")
+
+def on_generation(ga_instance):
+    """Log racing costs, and checkpoint the run with the fitness cache every GA_CHECKPOINT_INTERVAL generations"""
+    if GA_RACING and VERBOSE_GA:
+        log_agent_steps(f"Generation {ga_instance.generations_completed}")
+    path = checkpoint_path()
+    if path and ga_instance.generations_completed % GA_CHECKPOINT_INTERVAL == 0:
+        if _island is None:
+            # Islands hand their cache entries to the parent, which saves them once
+            get_cache().save()
+        save_checkpoint(ga_instance, path, truncated_mask(ga_instance.population))
+
+def create_ga_instance(num_generations=None, initial_population=None, **options):
+    """Build the pygad.GA used to evolve the genome (GA_GENERATIONS by default)
+
+    Keyword options override the matching pygad.GA arguments.
+    """
+    import pygad  # Pulls in matplotlib, so only loaded when evolving
+    settings = dict(
+        num_generations=GA_GENERATIONS if num_generations is None else num_generations,
+        initial_population=initial_population,
         num_parents_mating=GA_PARENTS_MATING,
-        fitness_func=fitness_func,
+        **dict(fitness_settings(), on_fitness=on_fitness),
         sol_per_pop=GA_POPULATION_SIZE,
         num_genes=GENOME_LENGTH,
         init_range_low=SPEED_MIN,
@@ -39,16 +77,96 @@ def run_genetic_algorithm():
         parent_selection_type="sss",
         crossover_type="single_point",
         mutation_by_replacement=True,
+        random_seed=GA_SEED,
+        on_generation=on_generation,
     )
+    settings.update(options)
+    return pygad.GA(**settings)
+
+def evolve(**options):
+    """Run the GA, resuming or seeding from the checkpoint as GA_RESUME asks
+
+    Keyword options are passed on to create_ga_instance. Returns
+    (best solution, best fitness).
+    """
+    checkpoint = None
+    if GA_RESUME in ("resume", "seed"):
+        checkpoint = load_checkpoint(checkpoint_path())
+        if checkpoint is None and VERBOSE_GA:
+            print("   No checkpoint found, starting a new run")
+
+    if checkpoint is None:
+        ga_instance = create_ga_instance(**options)
+    elif GA_RESUME == "resume":
+        done = int(checkpoint["generation"])
+        if done >= GA_GENERATIONS:
+            if VERBOSE_GA:
+                print(f"   Checkpointed run already completed {done} generations")
+            return best_of(checkpoint)
+        if VERBOSE_GA:
+            print(f"   Resuming from generation {done} of {GA_GENERATIONS}")
+        ga_instance = create_ga_instance(GA_GENERATIONS - done, checkpoint["population"], **options)
+        resume(ga_instance, checkpoint)
+    else:
+        if VERBOSE_GA:
+            print(f"   Seeding the population from {checkpoint_path()}")
+        ga_instance = create_ga_instance(initial_population=checkpoint["population"], **options)
+        reuse_fitness(ga_instance, checkpoint["fitness"], checkpoint.get("truncated"))
 
     ga_instance.run()
+    if checkpoint_path():
+        save_checkpoint(ga_instance, checkpoint_path(), truncated_mask(ga_instance.population))
+    best_solution, best_fitness, _ = ga_instance.best_solution(ga_instance.last_generation_fitness)
+    return best_solution, best_fitness
+
+def run_genetic_algorithm():
+    """Run genetic algorithm to evolve optimal genome"""
+    if VERBOSE_GA:
+        print("🧬 Starting Genetic Algorithm Evolution...")
+        if worker_count() > 1:
+            print(f"   Evaluating fitness on {worker_count()} worker processes")
     
-    best_solution, best_fitness, _ = ga_instance.best_solution()
+    metrics = get_metrics()
+    if metrics is not None:
+        metrics.clear()  # Profile this run only
+    if GA_ISLANDS > 1:
+        from islands import run_islands
+        best_solution, best_fitness = run_islands()
+    else:
+        best_solution, best_fitness = evolve()
+    cache = get_cache()
+    cache.save()
     
     if VERBOSE_GA:
         print(f"🏆 Evolution Complete!")
         print(f"   Best Genome: [Speed: {best_solution[0]:.2f}, Exploration: {best_solution[1]:.2f}]")
         print(f"   Best Fitness: {best_fitness:.1f} cells explored")
+        if cache.hits or cache.misses:
+            print(f"   Fitness cache: {cache.hits} hits, {cache.misses} misses ({cache.hit_rate():.0%} hit rate)")
+        saved, budget = step_savings()
+        if budget:
+            print(f"   Early stopping saved {saved} of {budget} simulation steps ({saved / budget:.0%})")
+        if GA_SURROGATE:
+            surrogate = get_surrogate()
+            print(f"   Surrogate: screened out {surrogate.screened_out} candidates, "
+                  f"avoided {surrogate.runs_avoided} simulations")
+            drift = surrogate.drift()
+            if drift:
+                mean_abs, bias, worst = drift
+                print(f"   Surrogate drift over {len(surrogate.errors)} audits: "
+                      f"mean |error| {mean_abs:.1f}, bias {bias:+.1f}, worst {worst:.1f}")
+
+    if metrics is not None and metrics.steps:
+        metrics.save(metrics_path())
+        if VERBOSE_GA:
+            summary = metrics.summary()
+            dominant = summary["dominant_phase"]
+            if dominant:
+                print(f"   Slowest step phase: {dominant} "
+                      f"({summary['phase_share'][dominant]:.0%} of {sum(summary['phase_seconds'].values()):.2f}s)")
+            print(f"   Conflicts: {summary['conflicts_per_step']:.2f} per step, "
+                  f"{summary['alternative_searches']} alternative-move searches")
+            print(f"   Profile saved to {metrics_path()}")
     
     return best_solution
 
@@ -108,8 +226,9 @@ def main():
     if DEBUG_MODE:
         print(f"🔍 Debug: Created {len(genomes)} genomes for {NUM_AGENTS} agents")
     
-    # Launch interactive visualization
-    launch_visualization(genomes)
+    # Launch interactive visualization (Mesa and its web server load only here)
+    from visualization import launch_visualization
+    launch_visualization(genomes, engine=SIMULATION_ENGINE, resolver=CONFLICT_RESOLVER)
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
@@ -0,0 +1,101 @@
+import json
+from time import perf_counter
+
+PHASES = ("clear", "sense", "plan", "resolve", "execute")
+
+
+class StepMetrics:
+    """Per-phase wall time, conflicts and coverage growth recorded by model steps
+
+    Attach one to a model (or ArrayEngine) through its `metrics` attribute;
+    with metrics left as None the step loop only pays for a few `is None`
+    checks. One object can collect many runs and worlds, and objects from
+    worker processes are combined with merge().
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        """Drop everything recorded so far"""
+        self.phase_seconds = dict.fromkeys(PHASES, 0.0)
+        self.steps = 0  # Calls to step()
+        self.world_steps = 0  # Steps summed over the worlds of batched engines
+        self.conflicts = 0  # Contested destination cells
+        self.max_conflicts = 0  # Most contested cells in one step
+        self.alternative_searches = 0  # Losers that had to look for another move
+        self.coverage_sum = []  # Team coverage after each step, summed over runs
+        self.coverage_runs = []  # Runs that reached each step
+        self.run_step = 0
+        self.last = 0.0
+
+    def start_run(self):
+        """Begin a new simulation, so coverage is recorded from step 0 again"""
+        self.run_step = 0
+
+    def start_step(self, worlds=1):
+        self.steps += 1
+        self.world_steps += worlds
+        self.last = perf_counter()
+
+    def lap(self, phase):
+        """Charge the time since the previous lap to `phase`"""
+        now = perf_counter()
+        self.phase_seconds[phase] += now - self.last
+        self.last = now
+
+    def record_conflicts(self, contested, losers):
+        self.conflicts += contested
+        self.max_conflicts = max(self.max_conflicts, contested)
+        self.alternative_searches += losers
+
+    def record_coverage(self, coverage):
+        """Add the team coverage of each world after the current step"""
+        if self.run_step == len(self.coverage_sum):
+            self.coverage_sum.append(0)
+            self.coverage_runs.append(0)
+        self.coverage_sum[self.run_step] += int(sum(coverage))
+        self.coverage_runs[self.run_step] += len(coverage)
+        self.run_step += 1
+
+    def merge(self, other):
+        """Add the counts of another StepMetrics (e.g. from a worker process)"""
+        for phase in PHASES:
+            self.phase_seconds[phase] += other.phase_seconds[phase]
+        self.steps += other.steps
+        self.world_steps += other.world_steps
+        self.conflicts += other.conflicts
+        self.max_conflicts = max(self.max_conflicts, other.max_conflicts)
+        self.alternative_searches += other.alternative_searches
+        for i, (total, runs) in enumerate(zip(other.coverage_sum, other.coverage_runs)):
+            if i == len(self.coverage_sum):
+                self.coverage_sum.append(0)
+                self.coverage_runs.append(0)
+            self.coverage_sum[i] += total
+            self.coverage_runs[i] += runs
+
+    def dominant_phase(self):
+        return max(PHASES, key=self.phase_seconds.get)
+
+    def summary(self):
+        """Plain dict of totals, phase shares and the mean coverage curve"""
+        total = sum(self.phase_seconds.values())
+        return {
+            "steps": self.steps,
+            "world_steps": self.world_steps,
+            "phase_seconds": dict(self.phase_seconds),
+            "phase_share": {phase: seconds / total if total else 0.0
+                            for phase, seconds in self.phase_seconds.items()},
+            "dominant_phase": self.dominant_phase() if total else None,
+            "conflicts": self.conflicts,
+            "conflicts_per_step": self.conflicts / self.world_steps if self.world_steps else 0.0,
+            "max_conflicts_in_step": self.max_conflicts,
+            "alternative_searches": self.alternative_searches,
+            "mean_coverage_by_step": [total / runs for total, runs
+                                      in zip(self.coverage_sum, self.coverage_runs)],
+        }
+
+    def save(self, path):
+        """Write summary() to a JSON file"""
+        with open(path, 'w') as f:
+            json.dump(self.summary(), f, indent=2)
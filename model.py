@@ -1,55 +1,213 @@
 from mesa import Model
 from mesa.space import MultiGrid
-from mesa.time import SimultaneousActivation
-from agent import EvolvingAgent
-from collections import defaultdict
+from mesa.time import BaseScheduler, SimultaneousActivation
+from agent import EvolvingAgent, ReplayAgent
+from engine import ArrayEngine, nearest_distance_field, tie_break_key, INF_DISTANCE, RESOLVERS
+from topology import get_topology
+from core import StepRunner
+from visited import VisitedCells
+from trajectory import Trajectory
+from collections import defaultdict, Counter
+import random
+import numpy as np
 
-class EvolvingModel(Model):
-    def __init__(self, genomes, width=10, height=10):
+ENGINES = ("agents", "numpy")
+
+class EvolvingModel(StepRunner, Model):
+    def __init__(self, genomes, width=10, height=10, engine="agents", seed=None, verbose=True,
+                 resolver="fitness", metrics=None):
         super().__init__()
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown engine {engine!r}, expected one of {ENGINES}")
+        if resolver not in RESOLVERS:
+            raise ValueError(f"Unknown resolver {resolver!r}, expected one of {RESOLVERS}")
+        if seed is not None:
+            self.reset_randomizer(seed)
+        self.engine = engine
+        self.resolver = resolver  # How move conflicts are settled
+        self.metrics = metrics  # Optional StepMetrics for per-phase profiling
+        self.genomes = genomes
+        self.verbose = verbose  # Announce each agent as it is created
+        self.move_conflicts = defaultdict(list)  # Track conflicting moves
+        self.occupancy = Counter()  # Agents per cell, updated on every move
+        self.distance_field = None  # Nearest-agent distances, rebuilt each step
+        self.topology = get_topology(width, height)  # Shared neighbour tables
+        self.running = True
+        if metrics is not None:
+            metrics.start_run()
+
+        if engine == "numpy":
+            # Agents live in arrays; the Mesa view is built by sync_agent_view
+            self.array_engine = ArrayEngine([genomes], self.topology, [self.random],
+                                            resolver, metrics)
+            self.grid = None
+            self.schedule = None
+            return
+
         self.grid = MultiGrid(width, height, torus=True)
         self.schedule = SimultaneousActivation(self)
-        self.messages = []
-        self.move_conflicts = defaultdict(list)  # Track conflicting moves
-        
+        self.coverage = VisitedCells(self.topology)  # Union of all agents' visits
+        self.place_agents(genomes)
+
+    def place_agents(self, genomes):
+        """Give each genome an agent, reusing existing ones, and place it at random"""
+        agents = self.schedule.agents
+        for agent in agents[len(genomes):]:
+            self.schedule.remove(agent)
+
         # Create agents from genomes
         for i, genome in enumerate(genomes):
-            agent = EvolvingAgent(i, self, genome)
-            self.schedule.add(agent)
+            if i < len(agents):
+                agent = agents[i]
+                agent.reset(genome)
+            else:
+                agent = EvolvingAgent(i, self, genome)
+                self.schedule.add(agent)
             
             # Place agent at random position
             x = self.random.randrange(self.grid.width)
             y = self.random.randrange(self.grid.height)
             self.grid.place_agent(agent, (x, y))
+            self.occupancy[(x, y)] += 1
             agent.visited.add((x, y))
+            self.coverage.add((x, y))
+
+    def reset(self, genomes, seed=None):
+        """Reinitialize in place for a new run with `genomes`
 
+        Reuses the grid, agents, bitmaps and topology tables, and gives the
+        same run as a new EvolvingModel built with the same genomes and seed.
+        """
+        # Like Model.__new__, an unseeded run draws a fresh seed
+        self.reset_randomizer(seed if seed is not None else random.random())
+        self.genomes = genomes
+        self.move_conflicts.clear()
+        self.occupancy.clear()
+        self.distance_field = None
         self.running = True
+        if self.metrics is not None:
+            self.metrics.start_run()
+
+        if self.engine == "numpy":
+            self.array_engine.reset([genomes])
+            # The Mesa view is rebuilt on the next sync_agent_view
+            self.grid = None
+            self.schedule = None
+            return
+
+        for agent in self.schedule.agents:
+            self.grid.remove_agent(agent)
+        self.coverage.clear()
+        self.place_agents(genomes)
+
+    def sync_agent_view(self):
+        """Build or refresh the Mesa grid and agents of an array-engine model"""
+        if self.engine != "numpy":
+            return
+        engine = self.array_engine
+        if self.grid is None:
+            self.grid = MultiGrid(engine.width, engine.height, torus=True)
+            self.schedule = SimultaneousActivation(self)
+            for i, genome in enumerate(self.genomes):
+                agent = EvolvingAgent(i, self, genome)
+                self.schedule.add(agent)
+                self.grid.place_agent(agent, engine.position(i))
+
+        for agent in self.schedule.agents:
+            pos = engine.position(agent.unique_id)
+            if pos != agent.pos:
+                self.grid.move_agent(agent, pos)
+            agent.visited.update(engine.visited_cells(agent.unique_id))
 
     def step(self):
         """Execute one time step with enhanced collision resolution"""
+        if self.engine == "numpy":
+            self.array_engine.step()
+            return
+
+        metrics = self.metrics
+        if metrics is not None:
+            metrics.start_step()
+
         # Phase 1: Clear previous step data
-        self.messages = []
         self.move_conflicts.clear()
+        if metrics is not None:
+            metrics.lap("clear")
         
-        # Phase 2: All agents sense and communicate
+        # Phase 2: All agents sense; positions are shared through the
+        # occupancy index and the distance field rather than message lists
         for agent in self.schedule.agents:
-            agent.send_position()
             agent.intended_move = None  # Reset intended moves
+        self.update_distance_field()
+        if metrics is not None:
+            metrics.lap("sense")
         
-        # Phase 3: All agents receive messages and plan moves
+        # Phase 3: All agents plan moves
         for agent in self.schedule.agents:
-            agent.receive_positions()
             agent.plan_move()  # New method: plan but don't execute yet
+        if metrics is not None:
+            metrics.lap("plan")
         
         # Phase 4: Resolve move conflicts
         self.resolve_move_conflicts()
+        if metrics is not None:
+            metrics.lap("resolve")
         
         # Phase 5: Execute all moves
         for agent in self.schedule.agents:
             if hasattr(agent, 'intended_move') and agent.intended_move:
                 if agent.intended_move != agent.pos:  # Only move if different position
-                    self.grid.move_agent(agent, agent.intended_move)
+                    self.move_agent(agent, agent.intended_move)
                     agent.visited.add(agent.intended_move)
+                    self.coverage.add(agent.intended_move)
+        if metrics is not None:
+            metrics.lap("execute")
+            metrics.record_coverage((len(self.coverage),))
+
+    def fitness_bound(self, remaining_steps):
+        """Highest total fitness reachable within `remaining_steps` more steps
+
+        Whatever its speed, an agent lands on one cell per step, so it can
+        add at most one new cell per step until it has seen the whole grid.
+        """
+        num_cells = self.topology.num_cells
+        if self.engine == "numpy":
+            counts = self.array_engine.visited_counts().tolist()
+        else:
+            counts = [agent.visited.count for agent in self.schedule.agents]
+        gain = sum(min(remaining_steps, num_cells - count) for count in counts)
+        return self.get_total_fitness() + gain
+
+    def move_agent(self, agent, pos):
+        """Move an agent on the grid and keep the occupancy index in step"""
+        self.occupancy[agent.pos] -= 1
+        if not self.occupancy[agent.pos]:
+            del self.occupancy[agent.pos]
+        self.grid.move_agent(agent, pos)
+        self.occupancy[pos] += 1
+
+    def update_distance_field(self):
+        """Compute distances from every cell to the nearest occupied cells"""
+        index = self.topology.index
+        cells = np.array([index[pos] for pos in self.occupancy], dtype=np.int64)
+        d1, l1, d2 = nearest_distance_field(cells, self.topology.width, self.topology.height)
+        self.distance_field = (d1.tolist(), l1.tolist(), d2.tolist())
+
+    def nearest_other_distance(self, pos, agent):
+        """Torus distance from pos to the nearest other agent, or None if there is none"""
+        d1, l1, d2 = self.distance_field
+        cell = self.topology.index[pos]
+        own = self.topology.index[agent.pos]
+        # The agent's own cell only counts if another agent shares it
+        if self.occupancy[agent.pos] > 1 or l1[cell] != own:
+            distance = d1[cell]
+        else:
+            distance = d2[cell]
+        return distance if distance < INF_DISTANCE else None
+
+    def is_occupied_by_other(self, pos, agent):
+        """Check whether any agent other than `agent` stands on pos"""
+        return self.occupancy[pos] > (pos == agent.pos)
 
     def resolve_move_conflicts(self):
         """Resolve cases where multiple agents want the same cell"""
@@ -58,6 +216,13 @@ class EvolvingModel(Model):
         for agent in self.schedule.agents:
             if hasattr(agent, 'intended_move') and agent.intended_move:
                 move_groups[agent.intended_move].append(agent)
+        if self.metrics is not None:
+            losers = [len(group) - 1 for group in move_groups.values() if len(group) > 1]
+            self.metrics.record_conflicts(len(losers), sum(losers))
+
+        if self.resolver == "exclusive":
+            self.resolve_exclusive(move_groups)
+            return
         
         # Resolve conflicts
         for destination, competing_agents in move_groups.items():
@@ -74,25 +239,48 @@ class EvolvingModel(Model):
                 for loser in losers:
                     loser.intended_move = self.find_alternative_move(loser, destination)
     
+    def resolve_exclusive(self, move_groups):
+        """Settle all conflicts in one pass so no two agents move into the same cell
+
+        The fittest claimant of each cell keeps it, ties broken by a seeded
+        per-step shuffle of agent ids. The other claimants then pick, in the
+        same priority order, a move among their safe cells that nobody has
+        claimed yet, so each agent scans its move list at most once.
+        """
+        contested = [group for group in move_groups.values() if len(group) > 1]
+        if not contested:
+            return
+        salt = self.random.getrandbits(32)
+
+        def priority(agent):
+            return -agent.get_fitness(), tie_break_key(agent.unique_id, salt)
+
+        claimed = set(move_groups)  # Destination index: each cell keeps its winner
+        losers = []
+        for group in contested:
+            group.sort(key=priority)
+            losers.extend(group[1:])
+        losers.sort(key=priority)
+
+        for agent in losers:
+            free = [pos for pos in self.topology.neighbour_positions(agent.speed)[agent.pos]
+                    if pos not in claimed and not self.is_occupied_by_other(pos, agent)]
+            if not free:
+                agent.intended_move = agent.pos
+                continue
+            unvisited = [pos for pos in free if pos not in agent.visited]
+            agent.intended_move = agent.random.choice(unvisited or free)
+            claimed.add(agent.intended_move)
+
     def find_alternative_move(self, agent, blocked_position):
         """Find alternative move when preferred position is blocked"""
-        x, y = agent.pos
-        
         # Generate alternative moves (exclude the blocked position)
         alternatives = []
-        for dx in range(-agent.speed, agent.speed + 1):
-            for dy in range(-agent.speed, agent.speed + 1):
-                if dx == 0 and dy == 0:
-                    continue
-                new_x, new_y = x + dx, y + dy
-                new_x = new_x % self.grid.width
-                new_y = new_y % self.grid.height
-                new_pos = (new_x, new_y)
-                
-                # Skip the blocked position and current positions of other agents
-                if (new_pos != blocked_position and 
-                    new_pos not in [pos for uid, pos in self.messages if uid != agent.unique_id]):
-                    alternatives.append(new_pos)
+        for new_pos in self.topology.neighbour_positions(agent.speed)[agent.pos]:
+            # Skip the blocked position and current positions of other agents
+            if (new_pos != blocked_position and 
+                not self.is_occupied_by_other(new_pos, agent)):
+                alternatives.append(new_pos)
         
         if alternatives:
             # Prefer unvisited cells
@@ -105,6 +293,71 @@ class EvolvingModel(Model):
             # No alternatives available, stay put
             return agent.pos
 
+    def agent_cells(self):
+        """Cell index (x * height + y) of every agent, in agent order"""
+        if self.engine == "numpy":
+            return self.array_engine.cell.copy()
+        index = self.topology.index
+        return np.array([index[agent.pos] for agent in self.schedule.agents], dtype=np.int64)
+
+    def agent_visit_counts(self):
+        """Number of cells each agent has visited"""
+        if self.engine == "numpy":
+            return self.array_engine.visited_counts()
+        return np.array([agent.visited.count for agent in self.schedule.agents], dtype=np.int64)
+
     def get_total_fitness(self):
         """Get combined fitness of all agents"""
-        return sum(agent.get_fitness() for agent in self.schedule.agents)
\ No newline at end of file
+        if self.engine == "numpy":
+            return self.array_engine.total_fitness()
+        return sum(agent.get_fitness() for agent in self.schedule.agents)
+
+    def get_team_coverage(self):
+        """Get the number of distinct cells visited by any agent"""
+        if self.engine == "numpy":
+            return self.array_engine.team_coverage()
+        return len(self.coverage)
+
+class ReplayModel(Model):
+    """Plays back a recorded trajectory instead of simulating it
+
+    Frames are read from the memory-mapped recording, so jumping to any step
+    costs one row lookup however long the run was.
+    """
+
+    def __init__(self, path, start_step=0):
+        super().__init__()
+        self.trajectory = Trajectory(path)
+        self.genomes = self.trajectory.genomes
+        self.topology = get_topology(self.trajectory.width, self.trajectory.height)
+        self.grid = MultiGrid(self.trajectory.width, self.trajectory.height, torus=True)
+        self.schedule = BaseScheduler(self)
+        positions = self.trajectory.positions_at(0)
+        for i, genome in enumerate(self.genomes):
+            agent = ReplayAgent(i, self, genome)
+            self.schedule.add(agent)
+            self.grid.place_agent(agent, positions[i])
+        self.current_step = 0
+        self.running = True
+        self.seek(start_step)
+
+    def seek(self, step):
+        """Show the frame of `step` (clamped to the recorded range)"""
+        self.current_step = max(0, min(int(step), self.trajectory.steps))
+        positions = self.trajectory.positions_at(self.current_step)
+        for agent in self.schedule.agents:
+            pos = positions[agent.unique_id]
+            if pos != agent.pos:
+                self.grid.move_agent(agent, pos)
+        self.running = self.current_step < self.trajectory.steps
+
+    def step(self):
+        """Advance to the next recorded frame"""
+        self.seek(self.current_step + 1)
+
+    def agent_cells(self):
+        return self.trajectory.cells(self.current_step)
+
+    def get_team_coverage(self):
+        """Distinct cells visited by any agent up to the current frame"""
+        return int(np.count_nonzero(self.trajectory.visit_heat(self.current_step)))
@@ -0,0 +1,46 @@
+"""Measure interpreter startup plus import time of the simulation entry points
+
+Each case runs in a fresh interpreter, so the numbers are what a new
+worker process or batch job pays before it can simulate anything.
+"""
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+REPEATS = 5
+
+CASES = [
+    ("python only", "pass"),
+    ("core (headless model)", "import core"),
+    ("evaluation (fitness worker)", "import evaluation"),
+    ("main (GA driver)", "import main"),
+    ("main + pygad (GA run)", "import main, pygad"),
+    ("model (Mesa model)", "import model"),
+    ("main + Mesa + visualization (eager)", "import main, pygad, model, visualization"),
+]
+
+def startup_time(code, repeats=REPEATS):
+    """Median wall time in seconds of `python -c code` from this directory"""
+    here = os.path.dirname(os.path.abspath(__file__))
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], cwd=here, check=True)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+def main():
+    print(f"⏱️  Startup time (median of {REPEATS} fresh interpreters)")
+    results = {}
+    for label, code in CASES:
+        results[label] = startup_time(code)
+        print(f"   {label:<38} {results[label] * 1000:8.1f} ms")
+
+    eager = results["main + Mesa + visualization (eager)"]
+    worker = results["evaluation (fitness worker)"]
+    print(f"🚀 Fitness workers start {eager / worker:.1f}x faster than with eager Mesa imports")
+
+if __name__ == '__main__':
+    main()
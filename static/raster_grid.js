@@ -0,0 +1,60 @@
+// Raster view for large grids: a coverage heatmap image plus one square per agent.
+// The server sends a full frame after a reset and then only the agents that
+// moved and the heatmap cells that changed.
+const RasterGridModule = function (canvas_width, canvas_height, grid_width, grid_height, colors) {
+  const canvas = document.createElement("canvas");
+  Object.assign(canvas, { width: canvas_width, height: canvas_height });
+  canvas.style.border = "1px solid #ccc";
+  document.getElementById("elements").appendChild(canvas);
+  const context = canvas.getContext("2d");
+
+  // Heatmap at one pixel per cell, scaled up when drawn
+  const heatCanvas = document.createElement("canvas");
+  Object.assign(heatCanvas, { width: grid_width, height: grid_height });
+  const heatContext = heatCanvas.getContext("2d");
+  const heat = heatContext.createImageData(grid_width, grid_height);
+  for (let i = 0; i < grid_width * grid_height; i++) {
+    heat.data.set([231, 76, 60, 0], 4 * i);
+  }
+
+  const cellWidth = canvas_width / grid_width;
+  const cellHeight = canvas_height / grid_height;
+  const size = Math.max(1, 0.8 * Math.min(cellWidth, cellHeight));
+  let cells = [];
+  let speeds = [];
+
+  // Cells are numbered x * grid_height + y, with y = 0 drawn at the bottom as in CanvasGrid
+  const pixel = (cell) =>
+    (grid_height - 1 - (cell % grid_height)) * grid_width + Math.floor(cell / grid_height);
+  const setHeat = (cell, level) => {
+    heat.data[4 * pixel(cell) + 3] = level;
+  };
+
+  this.render = (data) => {
+    if (data.frame === "full") {
+      cells = data.cells;
+      speeds = data.speeds;
+      const levels = atob(data.heat);
+      for (let cell = 0; cell < levels.length; cell++) setHeat(cell, levels.charCodeAt(cell));
+    } else {
+      for (let i = 0; i < data.moved.length; i += 2) cells[data.moved[i]] = data.moved[i + 1];
+      for (let i = 0; i < data.heat.length; i += 2) setHeat(data.heat[i], data.heat[i + 1]);
+    }
+    heatContext.putImageData(heat, 0, 0);
+
+    context.clearRect(0, 0, canvas_width, canvas_height);
+    context.imageSmoothingEnabled = false;
+    context.drawImage(heatCanvas, 0, 0, canvas_width, canvas_height);
+    for (let a = 0; a < cells.length; a++) {
+      const x = Math.floor(cells[a] / grid_height);
+      const y = cells[a] % grid_height;
+      context.fillStyle = colors[speeds[a]] || "#95a5a6";
+      context.fillRect((x + 0.5) * cellWidth - size / 2,
+                       (grid_height - y - 0.5) * cellHeight - size / 2, size, size);
+    }
+  };
+
+  this.reset = () => {
+    context.clearRect(0, 0, canvas_width, canvas_height);
+  };
+};
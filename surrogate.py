@@ -0,0 +1,82 @@
+from collections import defaultdict
+import numpy as np
+
+
+class FitnessSurrogate:
+    """Cheap fitness model: one polynomial in exploration_chance per speed level
+
+    Speed decodes to a few integer levels and fitness varies smoothly with
+    exploration_chance, so a low-degree fit per level from the exact
+    evaluations seen so far is enough to tell clearly weak candidates apart.
+    Fits are redone lazily when a level gets new observations.
+    """
+
+    def __init__(self, degree, min_samples):
+        self.degree = degree
+        self.min_samples = min_samples
+        self.observations = defaultdict(dict)  # speed -> {exploration_chance: fitness}
+        self.fits = {}  # speed -> (coefficients, residual spread); dropped when stale
+        self.screened_out = 0  # Candidates the surrogate judged not worth simulating
+        self.skipped = 0  # ... of which were not simulated
+        self.runs_avoided = 0  # Simulations those skips saved
+        self.errors = []  # prediction - true fitness for audited candidates
+
+    def observe(self, speed, exploration_chance, fitness):
+        """Record an exact fitness for a phenotype"""
+        self.observations[speed][exploration_chance] = fitness
+        self.fits.pop(speed, None)
+
+    def fit(self, speed):
+        """(coefficients, residual spread) for a speed level, or None without enough data"""
+        if speed in self.fits:
+            return self.fits[speed]
+        points = self.observations.get(speed, {})
+        if len(points) < self.min_samples:
+            return None
+        x = np.fromiter(points.keys(), dtype=float)
+        y = np.fromiter(points.values(), dtype=float)
+        degree = min(self.degree, len(points) - 2)
+        coefficients = np.polyfit(x, y, degree)
+        residuals = y - np.polyval(coefficients, x)
+        spread = float(np.sqrt(residuals @ residuals / (len(points) - degree - 1)))
+        self.fits[speed] = (coefficients, spread)
+        return self.fits[speed]
+
+    def predict(self, speed, exploration_chance):
+        """(predicted fitness, residual spread), or None while the level is untrained"""
+        fit = self.fit(speed)
+        if fit is None:
+            return None
+        coefficients, spread = fit
+        return float(np.polyval(coefficients, exploration_chance)), spread
+
+    def screen_out(self, audit_every):
+        """Count a screened-out candidate; True when it should be simulated anyway as an audit"""
+        self.screened_out += 1
+        return audit_every > 0 and self.screened_out % audit_every == 0
+
+    def record_skip(self, runs):
+        self.skipped += 1
+        self.runs_avoided += runs
+
+    def record_audit(self, predicted, actual):
+        self.errors.append(predicted - actual)
+
+    def reset_counts(self):
+        """Forget the screening counts and audits, keeping the fits"""
+        self.screened_out = self.skipped = self.runs_avoided = 0
+        self.errors = []
+
+    def merge(self, other):
+        """Add another surrogate's screening counts and audits (e.g. from an island)"""
+        self.screened_out += other.screened_out
+        self.skipped += other.skipped
+        self.runs_avoided += other.runs_avoided
+        self.errors.extend(other.errors)
+
+    def drift(self):
+        """(mean absolute error, mean signed error, worst error) over the audits, or None"""
+        if not self.errors:
+            return None
+        errors = np.array(self.errors)
+        return float(np.abs(errors).mean()), float(errors.mean()), float(np.abs(errors).max())
@@ -0,0 +1,81 @@
+"""Seeded runs must not depend on the engine, on model reuse or on batching
+
+Run with `python -m pytest`.
+"""
+import random
+from collections import Counter
+import pytest
+import evaluation
+from core import HeadlessModel
+from model import EvolvingModel
+from config import *  # Import all configuration constants
+
+STEPS = 30
+GRIDS = [(10, 10, 10), (5, 7, 12), (16, 9, 4), (3, 3, 9)]  # (width, height, agents)
+RESOLVERS = ["fitness", "exclusive"]
+
+def random_genomes(count, seed):
+    rng = random.Random(seed)
+    return [[rng.uniform(SPEED_MIN, SPEED_MAX), rng.uniform(EXPLORATION_MIN, EXPLORATION_MAX)]
+            for _ in range(count)]
+
+def build(kind, genomes, width, height, seed, resolver):
+    if kind == "headless":
+        return HeadlessModel(genomes, width, height, seed=seed, resolver=resolver)
+    return EvolvingModel(genomes, width, height, engine=kind, seed=seed, verbose=False,
+                         resolver=resolver)
+
+def state(model):
+    return (model.agent_cells().tolist(), model.agent_visit_counts().tolist(),
+            model.get_total_fitness(), model.get_team_coverage())
+
+def assert_same_runs(models, steps=STEPS):
+    expected = state(models[0])
+    assert all(state(model) == expected for model in models[1:])
+    for step in range(steps):
+        for model in models:
+            model.step()
+        expected = state(models[0])
+        for model in models[1:]:
+            assert state(model) == expected, f"diverged at step {step + 1}"
+
+@pytest.mark.parametrize("resolver", RESOLVERS)
+@pytest.mark.parametrize("width, height, agents", GRIDS)
+def test_engines_match(width, height, agents, resolver):
+    genomes = random_genomes(agents, width * height + agents)
+    assert_same_runs([build(kind, genomes, width, height, 7, resolver)
+                      for kind in ("agents", "numpy", "headless")])
+
+@pytest.mark.parametrize("kind", ["agents", "numpy", "headless"])
+@pytest.mark.parametrize("resolver", RESOLVERS)
+def test_reset_matches_fresh_model(kind, resolver):
+    width, height, agents = GRIDS[1]
+    pooled = build(kind, random_genomes(agents, 1), width, height, 1, resolver)
+    for _ in range(STEPS):
+        pooled.step()
+    genomes = random_genomes(agents, 2)
+    pooled.reset(genomes, 2)
+    assert_same_runs([build(kind, genomes, width, height, 2, resolver), pooled])
+
+@pytest.mark.parametrize("early_stop", [True, False])
+@pytest.mark.parametrize("resolver", RESOLVERS)
+def test_batch_matches_single_runs(monkeypatch, resolver, early_stop):
+    monkeypatch.setattr(evaluation, "CONFLICT_RESOLVER", resolver)
+    monkeypatch.setattr(evaluation, "GA_EARLY_STOP", early_stop)
+    solutions = random_genomes(6, 3)
+    seeds = list(range(len(solutions)))
+    stops = [None, 0, 518, 519, None, 600]  # Mixes full runs with runs stopped mid-way
+    expected = [evaluation.simulate(solution, seed, stop)
+                for solution, seed, stop in zip(solutions, seeds, stops)]
+    assert evaluation.simulate_batch(solutions, seeds, stops) == expected
+
+@pytest.mark.parametrize("kind", ["agents", "headless"])
+@pytest.mark.parametrize("width, height, agents", GRIDS)
+def test_exclusive_resolver_never_collides(kind, width, height, agents):
+    model = build(kind, random_genomes(agents, 4), width, height, 5, "exclusive")
+    for _ in range(STEPS):
+        before = Counter(model.agent_cells().tolist())
+        model.step()
+        # A cell may only hold several agents if it already did before the step
+        for cell, count in Counter(model.agent_cells().tolist()).items():
+            assert count == 1 or count <= before[cell]
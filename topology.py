@@ -0,0 +1,70 @@
+from functools import lru_cache
+import numpy as np
+
+MAX_SPEED = 3
+
+
+def move_offsets(speed):
+    """Return (dx, dy) offsets in the order EvolvingAgent.plan_move generates them"""
+    offsets = [(dx, dy)
+               for dx in range(-speed, speed + 1)
+               for dy in range(-speed, speed + 1)
+               if dx != 0 or dy != 0]
+    return np.array(offsets, dtype=np.int64).reshape(-1, 2)
+
+
+class GridTopology:
+    """Precomputed neighbour tables and edge bonuses for one torus size
+
+    Cells are numbered x * height + y. Tables are built once per speed on
+    first use and shared by every model with the same dimensions, so the
+    per-step loops only look things up.
+    """
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.num_cells = width * height
+
+        xs, ys = np.divmod(np.arange(self.num_cells), height)
+        self.positions = list(zip(xs.tolist(), ys.tolist()))
+        self.index = {pos: i for i, pos in enumerate(self.positions)}
+        self.empty_bitmap = bytes((self.num_cells + 7) // 8)  # One bit per cell
+
+        # Coordinate wrap maps, offset by MAX_SPEED so negative steps index directly
+        self.wrap_x = np.arange(-MAX_SPEED, width + MAX_SPEED) % width
+        self.wrap_y = np.arange(-MAX_SPEED, height + MAX_SPEED) % height
+
+        self.edge_distance = np.minimum.reduce([xs, width - xs - 1, ys, height - ys - 1])
+        self.edge_bonus = dict(zip(self.positions, (2 * self.edge_distance).tolist()))
+
+        self._neighbour_index = {}
+        self._neighbour_positions = {}
+
+    def neighbour_index(self, speed):
+        """(num_cells, moves) array of the cells reachable at `speed`, in move order"""
+        table = self._neighbour_index.get(speed)
+        if table is None:
+            offsets = move_offsets(speed)
+            xs, ys = np.divmod(np.arange(self.num_cells), self.height)
+            nx = self.wrap_x[xs[:, None] + offsets[:, 0] + MAX_SPEED]
+            ny = self.wrap_y[ys[:, None] + offsets[:, 1] + MAX_SPEED]
+            table = nx * self.height + ny
+            self._neighbour_index[speed] = table
+        return table
+
+    def neighbour_positions(self, speed):
+        """Map each (x, y) to the tuple of (x, y) cells reachable at `speed`"""
+        table = self._neighbour_positions.get(speed)
+        if table is None:
+            positions = self.positions
+            table = {pos: tuple(positions[c] for c in row)
+                     for pos, row in zip(positions, self.neighbour_index(speed).tolist())}
+            self._neighbour_positions[speed] = table
+        return table
+
+
+@lru_cache(maxsize=None)
+def get_topology(width, height):
+    """Return the shared GridTopology for a width x height torus"""
+    return GridTopology(width, height)
@@ -0,0 +1,180 @@
+"""Compact trajectory files written and read through memory maps
+
+A recording is a .npy array of shape (steps + 1, agents) holding each
+agent's cell index (x * height + y) at the start and after every step, in
+the smallest unsigned dtype that fits the grid. With visited deltas, a
+second .npy holds one bit per agent and step that is set when the agent
+reached a cell it had not visited before, so per-agent fitness at any step
+is a running count rather than a replay of the history. A third .npy
+holds the cumulative visit heat of every cell at every
+TRAJECTORY_HEAT_INTERVAL-th step, so the heat at any step is one
+checkpoint plus fewer than that many position rows. A small JSON sidecar
+records the grid size, genomes and how many steps were written.
+"""
+import json
+import numpy as np
+from numpy.lib.format import open_memmap
+from utils import decode_genome
+from config import *  # Import all configuration constants
+
+def cell_dtype(num_cells):
+    """Smallest unsigned dtype that holds every cell index of a grid"""
+    return np.uint16 if num_cells <= 1 << 16 else np.uint32
+
+def visited_path(path):
+    return path[:-4] + ".visited.npy" if path.endswith(".npy") else path + ".visited.npy"
+
+def heat_path(path):
+    return path[:-4] + ".heat.npy" if path.endswith(".npy") else path + ".heat.npy"
+
+def meta_path(path):
+    return path[:-4] + ".json" if path.endswith(".npy") else path + ".json"
+
+
+class TrajectoryRecorder:
+    """Write a model's agent positions, and optionally visited deltas, step by step
+
+    Rows for all `steps` are allocated up front and filled through a
+    memory map, so recording costs one row copy per step whatever the run
+    length. Cumulative heat is kept in memory and written every
+    `heat_interval` steps. Works with any model that has agent_cells()
+    and, for visited deltas, agent_visit_counts(). The starting positions
+    are recorded on creation; call record() after each step and close()
+    at the end.
+    """
+
+    def __init__(self, path, model, steps, visited=True, heat_interval=None):
+        self.path = path
+        self.width = model.topology.width
+        self.height = model.topology.height
+        self.genomes = [[float(gene) for gene in genome] for genome in model.genomes]
+        num_agents = len(self.genomes)
+        self.positions = open_memmap(path, mode="w+", dtype=cell_dtype(model.topology.num_cells),
+                                     shape=(steps + 1, num_agents))
+        self.visited = None
+        if visited:
+            self.visited = open_memmap(visited_path(path), mode="w+", dtype=np.uint8,
+                                       shape=(steps + 1, (num_agents + 7) // 8))
+        self.heat_interval = heat_interval or TRAJECTORY_HEAT_INTERVAL
+        self.heat = np.zeros(model.topology.num_cells, dtype=np.uint32)
+        self.heat_checkpoints = open_memmap(heat_path(path), mode="w+", dtype=np.uint32,
+                                            shape=(steps // self.heat_interval + 1, len(self.heat)))
+        self.counts = None
+        self.rows = 0
+        self.record(model)
+
+    def record(self, model):
+        """Append the model's current positions (and newly visited flags)"""
+        if self.rows == len(self.positions):
+            raise ValueError(f"Trajectory {self.path} is full ({self.rows - 1} steps)")
+        cells = model.agent_cells()
+        self.positions[self.rows] = cells
+        np.add.at(self.heat, cells, 1)
+        if self.rows % self.heat_interval == 0:
+            self.heat_checkpoints[self.rows // self.heat_interval] = self.heat
+        if self.visited is not None:
+            counts = model.agent_visit_counts()
+            new = counts > self.counts if self.counts is not None else np.ones(len(counts), dtype=bool)
+            self.visited[self.rows] = np.packbits(new, bitorder="little")
+            self.counts = counts
+        self.rows += 1
+
+    def close(self):
+        """Flush the arrays and write the sidecar describing them"""
+        self.positions.flush()
+        self.heat_checkpoints.flush()
+        if self.visited is not None:
+            self.visited.flush()
+        with open(meta_path(self.path), 'w') as f:
+            json.dump({
+                "width": self.width,
+                "height": self.height,
+                "steps": self.rows - 1,
+                "genomes": self.genomes,
+                "visited": self.visited is not None,
+                "heat_interval": self.heat_interval,
+            }, f, indent=2)
+
+
+class Trajectory:
+    """Read-only view of a recording; frames come straight from the memory map"""
+
+    def __init__(self, path):
+        with open(meta_path(path), 'r') as f:
+            meta = json.load(f)
+        self.width = meta["width"]
+        self.height = meta["height"]
+        self.steps = meta["steps"]
+        self.genomes = meta["genomes"]
+        self.positions = np.load(path, mmap_mode="r")
+        self.visited = np.load(visited_path(path), mmap_mode="r") if meta["visited"] else None
+        self.heat_interval = meta.get("heat_interval")
+        self.heat_checkpoints = None
+        if self.heat_interval:
+            self.heat_checkpoints = np.load(heat_path(path), mmap_mode="r")
+
+    def cells(self, step):
+        """Cell index of every agent at `step` (0 = starting positions)"""
+        return np.asarray(self.positions[step], dtype=np.int64)
+
+    def positions_at(self, step):
+        """(x, y) of every agent at `step`"""
+        xs, ys = np.divmod(self.cells(step), self.height)
+        return list(zip(xs.tolist(), ys.tolist()))
+
+    def new_visits(self, step):
+        """Bool per agent: did it reach a cell new to it at `step`"""
+        if self.visited is None:
+            raise ValueError("Trajectory was recorded without visited deltas")
+        flags = np.unpackbits(self.visited[step], bitorder="little")
+        return flags[:self.positions.shape[1]].astype(bool)
+
+    def visit_counts(self, step):
+        """Cells each agent had visited by `step`"""
+        if self.visited is None:
+            raise ValueError("Trajectory was recorded without visited deltas")
+        flags = np.unpackbits(self.visited[:step + 1], axis=1, bitorder="little")
+        return flags[:, :self.positions.shape[1]].sum(axis=0, dtype=np.int64)
+
+    def visit_heat(self, step):
+        """Agent-steps spent on each cell up to `step`, as a (width, height) array
+
+        Starts from the last heat checkpoint at or before `step`, so at most
+        heat_interval - 1 position rows are read.
+        """
+        cells = self.width * self.height
+        if self.heat_checkpoints is None:
+            counts = np.bincount(np.asarray(self.positions[:step + 1]).ravel(), minlength=cells)
+        else:
+            checkpoint = step // self.heat_interval
+            first = checkpoint * self.heat_interval + 1
+            counts = self.heat_checkpoints[checkpoint].astype(np.int64)
+            counts += np.bincount(np.asarray(self.positions[first:step + 1]).ravel(),
+                                  minlength=cells)
+        return counts.reshape(self.width, self.height)
+
+
+def record_run(model, steps, path, visited=True, heat_interval=None):
+    """Run `model` for `steps` steps, recording every step to `path`"""
+    recorder = TrajectoryRecorder(path, model, steps, visited, heat_interval)
+    for _ in range(steps):
+        model.step()
+        recorder.record(model)
+    recorder.close()
+    return recorder
+
+if __name__ == '__main__':
+    from utils import load_genome
+    from evaluation import get_model, scoring_seeds, phenotype_key, phenotype_genome
+    genome = load_genome()
+    if genome is None:
+        print("❌ No saved genome to record, run main.py first")
+    else:
+        # The GA simulated the genome's phenotype, and this is the first seed it scored it on
+        seed = scoring_seeds()[0]
+        simulated = phenotype_genome(phenotype_key(genome, seed))
+        model = get_model([simulated for _ in range(NUM_AGENTS)], seed)
+        record_run(model, SIMULATION_STEPS, TRAJECTORY_FILE, TRAJECTORY_VISITED)
+        speed, exploration_chance = decode_genome(genome)
+        print(f"🎞️  Recorded {SIMULATION_STEPS} steps of {NUM_AGENTS} agents "
+              f"(Speed={speed}, Exploration={exploration_chance:.2f}) to {TRAJECTORY_FILE}")
@@ -1,14 +1,27 @@
 import json
 import os
+from datetime import datetime
 from config import GENOME_SAVE_FILE, DEBUG_MODE
 
+def decode_genome(genome):
+    """Convert raw genome values to (speed, exploration_chance)"""
+    speed = max(1, min(3, int(genome[0])))
+    # Normalize exploration chance to 0-1 range if it's outside
+    raw_exploration = genome[1]
+    if raw_exploration > 1.0:
+        exploration_chance = raw_exploration / 3.0  # Scale down from 0-3 to 0-1
+    else:
+        exploration_chance = raw_exploration
+    exploration_chance = max(0.0, min(1.0, exploration_chance))
+    return speed, exploration_chance
+
 def save_genome(genome):
     """Save the best genome to file"""
     try:
         with open(GENOME_SAVE_FILE, 'w') as f:
             json.dump({
                 "genome": genome,
-                "timestamp": "2025-06-27",
+                "timestamp": datetime.now().isoformat(timespec="seconds"),
                 "version": "1.0"
             }, f, indent=2)
         
@@ -0,0 +1,73 @@
+from collections.abc import MutableSet
+import numpy as np
+
+
+class VisitedCells(MutableSet):
+    """Set of (x, y) cells stored as a bitmap over the topology's cell indices
+
+    Membership, add and len() are O(1): the number of set bits is kept up to
+    date as cells are added, so fitness never walks the set. Items that are
+    not cells of the grid (such as the None an agent records before it is
+    placed) are kept in a small overflow set so len() stays unchanged.
+    """
+
+    __slots__ = ("topology", "bits", "count", "extra")
+
+    def __init__(self, topology, cells=()):
+        self.topology = topology
+        self.bits = bytearray(topology.empty_bitmap)
+        self.count = 0
+        self.extra = set()
+        self.update(cells)
+
+    def __contains__(self, pos):
+        i = self.topology.index.get(pos)
+        if i is None:
+            return pos in self.extra
+        return bool(self.bits[i >> 3] >> (i & 7) & 1)
+
+    def __iter__(self):
+        positions = self.topology.positions
+        for i in np.flatnonzero(self.bitmap()).tolist():
+            yield positions[i]
+        yield from self.extra
+
+    def __len__(self):
+        return self.count + len(self.extra)
+
+    def __repr__(self):
+        return f"VisitedCells({len(self)} cells)"
+
+    def add(self, pos):
+        i = self.topology.index.get(pos)
+        if i is None:
+            self.extra.add(pos)
+            return
+        byte, mask = i >> 3, 1 << (i & 7)
+        if not self.bits[byte] & mask:
+            self.bits[byte] |= mask
+            self.count += 1
+
+    def discard(self, pos):
+        i = self.topology.index.get(pos)
+        if i is None:
+            self.extra.discard(pos)
+            return
+        byte, mask = i >> 3, 1 << (i & 7)
+        if self.bits[byte] & mask:
+            self.bits[byte] &= ~mask
+            self.count -= 1
+
+    def clear(self):
+        self.bits[:] = self.topology.empty_bitmap
+        self.count = 0
+        self.extra.clear()
+
+    def update(self, cells):
+        for pos in cells:
+            self.add(pos)
+
+    def bitmap(self):
+        """Return the visited flags as a bool array indexed by cell"""
+        flags = np.unpackbits(np.frombuffer(self.bits, dtype=np.uint8), bitorder="little")
+        return flags[:self.topology.num_cells].astype(bool)
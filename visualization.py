@@ -1,6 +1,100 @@
+import base64
+import json
+import os
+import sys
+import numpy as np
+from mesa.visualization import Slider
 from mesa.visualization.modules import CanvasGrid
-from mesa.visualization.ModularVisualization import ModularServer
-from model import EvolvingModel
+from mesa.visualization.ModularVisualization import ModularServer, VisualizationElement
+from model import EvolvingModel, ReplayModel
+from trajectory import Trajectory
+from utils import decode_genome
+from config import *  # Import all configuration constants
+
+SPEED_COLORS = {
+    1: "#2980b9",  # Bright Blue (slow)
+    2: "#e67e22",  # Bright Orange (medium)
+    3: "#c0392b"   # Bright Red (fast)
+}
+
+class EngineCanvasGrid(CanvasGrid):
+    """CanvasGrid that builds the Mesa agent view of array-engine models on demand"""
+
+    def render(self, model):
+        model.sync_agent_view()
+        return super().render(model)
+
+class RasterGrid(VisualizationElement):
+    """Grid drawn as one coverage heatmap raster plus a square per agent
+
+    After a reset the browser gets one full frame; every step after that
+    only carries the agents that moved and the heatmap cells whose level
+    changed, as flat [index, value, ...] lists. Positions come from
+    model.agent_cells(), so array-engine models never build Mesa agents.
+    The heatmap counts agent-steps spent on each cell, saturating at
+    VIZ_HEAT_SATURATION. Frames are diffed against the last render, so
+    each server should be watched from a single browser tab.
+    """
+
+    local_includes = ["raster_grid.js"]
+    local_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+
+    def __init__(self, grid_width, grid_height, canvas_width=600, canvas_height=600):
+        super().__init__()
+        self.grid_width = grid_width
+        self.grid_height = grid_height
+        self.model = None
+        self.js_code = (f"elements.push(new RasterGridModule({canvas_width}, {canvas_height}, "
+                        f"{grid_width}, {grid_height}, {json.dumps(SPEED_COLORS)}));")
+
+    def heat_levels(self):
+        return np.minimum(self.heat * 255 // VIZ_HEAT_SATURATION, 255).astype(np.uint8)
+
+    def render(self, model):
+        cells = model.agent_cells()
+        if model is not self.model:
+            return self.full_frame(model, cells)
+        moved = np.flatnonzero(cells != self.cells)
+        self.cells = cells
+        self.heat += np.bincount(cells, minlength=len(self.heat))
+        levels = self.heat_levels()
+        changed = np.flatnonzero(levels != self.levels)
+        self.levels = levels
+        return {
+            "frame": "delta",
+            "moved": np.column_stack((moved, cells[moved])).ravel().tolist(),
+            "heat": np.column_stack((changed, levels[changed])).ravel().tolist(),
+        }
+
+    def full_frame(self, model, cells):
+        """Everything the browser needs after a reset or a jump"""
+        self.model = model
+        self.cells = cells
+        if isinstance(model, ReplayModel):
+            self.heat = model.trajectory.visit_heat(model.current_step).ravel()
+        else:
+            self.heat = np.bincount(cells, minlength=self.grid_width * self.grid_height)
+        self.levels = self.heat_levels()
+        return {
+            "frame": "full",
+            "cells": cells.tolist(),
+            "speeds": [decode_genome(genome)[0] for genome in model.genomes],
+            "heat": base64.b64encode(self.levels.tobytes()).decode("ascii"),
+        }
+
+def use_raster(width, height, num_agents):
+    """Whether VIZ_RENDERER picks the raster view for a grid of this size"""
+    if VIZ_RENDERER != "auto":
+        return VIZ_RENDERER == "raster"
+    return width * height > VIZ_PORTRAYAL_LIMIT or num_agents > VIZ_PORTRAYAL_LIMIT
+
+def grid_element(width, height, num_agents, canvas_grid=CanvasGrid):
+    """Raster or per-agent portrayal grid, with a canvas keeping the grid's aspect ratio"""
+    scale = CANVAS_SIZE / max(width, height)
+    canvas_width, canvas_height = round(width * scale), round(height * scale)
+    if use_raster(width, height, num_agents):
+        return RasterGrid(width, height, canvas_width, canvas_height)
+    return canvas_grid(agent_portrayal, width, height, canvas_width, canvas_height)
 
 def agent_portrayal(agent):
     """Define how agents appear in visualization"""
@@ -8,15 +102,8 @@ def agent_portrayal(agent):
     # Ensure we have the agent's actual speed (should be 1, 2, or 3)
     actual_speed = max(1, min(3, int(agent.speed)))
     
-    # More vibrant colors based on speed
-    speed_colors = {
-        1: "#2980b9",  # Bright Blue (slow)
-        2: "#e67e22",  # Bright Orange (medium) 
-        3: "#c0392b"   # Bright Red (fast)
-    }
-    
     # Get color, with fallback
-    color = speed_colors.get(actual_speed, "#95a5a6")
+    color = SPEED_COLORS.get(actual_speed, "#95a5a6")
     
     # Size based on exploration chance (clamped to reasonable range)
     exploration_normalized = max(0.0, min(1.0, agent.exploration_chance))
@@ -38,8 +125,12 @@ def agent_portrayal(agent):
     
     return portrayal
 
-def launch_visualization(genomes):
-    """Launch Mesa visualization server"""
+def launch_visualization(genomes, engine="agents", resolver="fitness", width=None, height=None,
+                         port=None):
+    """Launch Mesa visualization server (grid size and port default to config.py)"""
+    width = width or GRID_WIDTH
+    height = height or GRID_HEIGHT
+    port = port or VISUALIZATION_PORT
     print(f"🔍 Visualization Debug: Received {len(genomes)} genomes")
     
     # Debug: Show what we're working with
@@ -50,26 +141,49 @@ def launch_visualization(genomes):
         print(f"📊 Sample agent will have: Speed={sample_speed}, Exploration={sample_exploration:.2f}")
     
     # Create the grid visualization
-    grid = CanvasGrid(
-        agent_portrayal, 
-        10, 10,           # Grid dimensions
-        600, 600          # Canvas size (larger for better visibility)
-    )
+    grid = grid_element(width, height, len(genomes), EngineCanvasGrid)
     
     server = ModularServer(
         EvolvingModel,
         [grid],
         f"Evolving Agentic AI Simulation ({len(genomes)} agents)",
-        {"genomes": genomes}
+        {"genomes": genomes, "width": width, "height": height, "engine": engine,
+         "resolver": resolver, "verbose": not isinstance(grid, RasterGrid)}
     )
     
-    server.port = 8521
+    server.port = port
     
-    print(f"🚀 Starting visualization with {len(genomes)} agents at http://localhost:8521")
+    print(f"🚀 Starting visualization with {len(genomes)} agents on a {width}×{height} grid "
+          f"at http://localhost:{port}")
     print("🎨 Color Legend:")
-    print("   🔵 Blue circles = Speed 1 (slow)")
-    print("   🟠 Orange circles = Speed 2 (medium)")
-    print("   🔴 Red circles = Speed 3 (fast)")
-    print("   📏 Larger circles = Higher exploration tendency")
+    print("   🔵 Blue = Speed 1 (slow)")
+    print("   🟠 Orange = Speed 2 (medium)")
+    print("   🔴 Red = Speed 3 (fast)")
+    if isinstance(grid, RasterGrid):
+        print("   🟥 Shaded cells = coverage heatmap (time agents spent there)")
+    else:
+        print("   📏 Larger circles = Higher exploration tendency")
     
-    server.launch()
\ No newline at end of file
+    server.launch()
+
+def launch_replay(path=TRAJECTORY_FILE, port=None):
+    """Serve a recorded trajectory; the start-step slider jumps straight to any frame"""
+    port = port or VISUALIZATION_PORT
+    trajectory = Trajectory(path)
+    print(f"🎞️  Replaying {path}: {len(trajectory.genomes)} agents, {trajectory.steps} steps")
+
+    grid = grid_element(trajectory.width, trajectory.height, len(trajectory.genomes))
+    server = ModularServer(
+        ReplayModel,
+        [grid],
+        f"Evolving Agentic AI Simulation (replay of {path})",
+        {"path": path,
+         "start_step": Slider("Start step", 0, 0, trajectory.steps, 1)}
+    )
+    server.port = port
+
+    print(f"🚀 Starting replay at http://localhost:{port}")
+    server.launch()
+
+if __name__ == '__main__':
+    launch_replay(sys.argv[1] if len(sys.argv) > 1 else TRAJECTORY_FILE)